@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the batch ``erfinv`` and ``erfcinv`` methods with a plain loop over
+the scalar functions.
+
+With PyErf installed (``pip install -e .`` in a checkout), run::
+
+    python benchmarks/batch_erfinv.py [N]
+"""
+
+import random
+import sys
+import timeit
+
+from pyerf import batch
+from pyerf import pyerf
+
+
+def inputs(n):
+    """
+    ``n`` inputs for each function, about a quarter of them in the tails.
+    """
+    rng = random.Random(0)
+    z = [rng.uniform(-0.999999, 0.999999) for _ in range(n)]
+    q = [1 - x for x in z]
+    return {"erfinv": z, "erfcinv": q}
+
+
+def best(func, values, repeat=5):
+    return min(timeit.repeat(lambda: func(values), number=1, repeat=repeat))
+
+
+def main(n=100000):
+    print(
+        "{:8}  {:12}  {:>10}  {:>8}".format("function", "method", "values/s", "speedup")
+    )
+    for name, values in sorted(inputs(n).items()):
+        scalar = getattr(pyerf, name)
+        baseline = best(lambda v: [scalar(x) for x in v], values)
+        timings = [("scalar loop", baseline)]
+        for method in sorted(batch._KERNELS[name]):
+            func = getattr(batch, name)
+            timings.append((method, best(lambda v: func(v, method=method), values)))
+        for method, seconds in timings:
+            row = "{:8}  {:12}  {:>10.0f}  {:>7.2f}x"
+            print(row.format(name, method, n / seconds, baseline / seconds))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
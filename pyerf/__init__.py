@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
-from .pyerf import erf, erfc, erfinv
+from .pyerf import erf, erfc, erfinv, erfcinv, ndtri, erf_diff
+from .stats import Normal, Normals, rank_inverse_normal
 
 __all__ = [
     "erf",
     "erfc",
     "erfinv",
+    "erfcinv",
+    "ndtri",
+    "erf_diff",
+    "rank_inverse_normal",
+    "Normal",
+    "Normals",
 ]
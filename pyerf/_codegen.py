@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Generate ``pyerf._kernels``: one straight-line function per cephes
+coefficient set, with the polynomial unrolled in Horner form and the
+coefficients inlined as constants.
+
+The generated module is committed and shipped with the package, so
+importing it costs no more than any other module. Regenerate it after
+changing a coefficient in ``pyerf.pyerf``::
+
+    python -m pyerf._codegen
+
+``--check`` exits with an error instead if the file is out of date.
+"""
+
+import argparse
+import os
+import sys
+
+from . import pyerf
+
+# (function name, coefficient list name, monic). Monic polynomials have an
+# implicit leading coefficient of 1, as with ``_p1evl``.
+POLYNOMIALS = [
+    ("erf_t", "ERF_T", False),
+    ("erf_u", "ERF_U", True),
+    ("erfc_p", "ERFC_P", False),
+    ("erfc_q", "ERFC_Q", True),
+    ("erfc_r", "ERFC_R", False),
+    ("erfc_s", "ERFC_S", True),
+    ("ndtri_p0", "NDTRI_P0", False),
+    ("ndtri_q0", "NDTRI_Q0", True),
+    ("ndtri_p1", "NDTRI_P1", False),
+    ("ndtri_q1", "NDTRI_Q1", True),
+    ("ndtri_p2", "NDTRI_P2", False),
+    ("ndtri_q2", "NDTRI_Q2", True),
+]
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_kernels.py")
+
+HEADER = '''\
+# -*- coding: utf-8 -*-
+# Generated by ``python -m pyerf._codegen``. Do not edit.
+"""
+Unrolled Horner evaluations of the cephes polynomials in ``pyerf.pyerf``.
+
+Each function evaluates one coefficient list at ``x`` with no loop, no
+indexing and no global lookups.
+"""
+'''
+
+# The generated module should be left unchanged by ``ruff format``, so
+# every line has to fit in its default line length.
+LINE_LENGTH = 88
+
+FUNCTION = '''
+
+def {name}(x):
+    """Evaluate ``{coefs}`` at ``x``, like ``_{evl}``."""
+{body}
+'''
+
+
+def _horner(coefs, monic):
+    """
+    Return the statements of Horner's scheme for ``coefs`` (highest order
+    first), split across as many assignments to ``r`` as it takes to keep
+    each line within ``LINE_LENGTH``, and ending with a ``return``.
+
+    The steps are evaluated in exactly the same order as in a single
+    expression, so the result is unchanged. Subtracting ``c`` is exactly
+    the same as adding ``-c`` in floating point, so negative coefficients
+    are written as subtractions.
+    """
+    if monic:
+        term, rest = "x", coefs
+    else:
+        term, rest = "{!r} * x".format(float(coefs[0])), coefs[1:]
+
+    indent = " " * 4
+    limit = LINE_LENGTH - len(indent + "return ")
+    statements = []
+    expr = None
+    for coef in rest:
+        step = " {} {!r}".format("-" if coef < 0 else "+", abs(float(coef)))
+        if expr is not None and len(term + step) > limit:
+            statements.append("r = " + expr)
+            term = "r * x"
+        expr = term + step
+        term = "({}) * x".format(expr)
+    statements.append("return " + expr)
+    return "\n".join(indent + statement for statement in statements)
+
+
+def generate():
+    """
+    Return the source of ``pyerf._kernels``.
+    """
+    parts = [HEADER]
+    for name, coefs_name, monic in POLYNOMIALS:
+        parts.append(
+            FUNCTION.format(
+                name=name,
+                coefs=coefs_name,
+                evl="p1evl" if monic else "polevl",
+                body=_horner(getattr(pyerf, coefs_name), monic),
+            )
+        )
+    return "".join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit with an error if the generated file is out of date",
+    )
+    parser.add_argument("--output", metavar="PATH", default=PATH)
+    args = parser.parse_args(argv)
+
+    source = generate()
+    if args.check:
+        try:
+            with open(args.output) as f:
+                current = f.read()
+        except (IOError, OSError):
+            current = None
+        if current != source:
+            sys.exit(
+                "{} is out of date. Run python -m pyerf._codegen".format(args.output)
+            )
+        return
+
+    with open(args.output, "w") as f:
+        f.write(source)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Branch-free batch kernels for ``erf`` and ``erfinv``.
+
+These evaluate the same cephes rational approximations as ``pyerf.pyerf``
+but push every element through an identical sequence of operations:
+
++ The approximation region is picked with index arithmetic (a boolean sum
+  used as a tuple index) rather than with ``if``/``else``.
++ Every coefficient set is zero-padded to degree 8 so one Estrin scheme
+  evaluates all of them. Estrin's scheme splits the polynomial into
+  independent sub-products instead of Horner's serial chain.
++ Special values are blended in at the end rather than branched around.
+
+This is the layout a SIMD implementation would use. In pure Python the
+win is uniformity rather than raw speed; see ``pyerf.batch``.
+"""
+
+import math
+
+from .pyerf import EXP_NEG2
+from .pyerf import ERF_T
+from .pyerf import ERF_U
+from .pyerf import ERFC_P
+from .pyerf import ERFC_Q
+from .pyerf import NDTRI_P0
+from .pyerf import NDTRI_Q0
+from .pyerf import NDTRI_P1
+from .pyerf import NDTRI_Q1
+from .pyerf import NDTRI_P2
+from .pyerf import NDTRI_Q2
+from .pyerf import ROOT_2PI
+from .pyerf import inf
+
+# erf(x) rounds to exactly 1.0 for x >= 5.92..., so clamping here keeps
+# exp() and the polynomials finite without changing any result.
+ERF_CLAMP = 6.0
+
+# Smallest positive double. Used to keep log() defined for erfinv(+-1);
+# those results are replaced with +-inf afterwards.
+TINY = 5e-324
+
+SQRT_2 = math.sqrt(2)
+
+
+def _pad(coefs, monic=False):
+    """
+    Convert cephes coefficients (highest order first) into a 9-tuple,
+    lowest order first, zero-padded up to degree 8.
+
+    If ``monic`` is True the implicit leading 1 used by ``_p1evl`` is added.
+    """
+    padded = list(reversed(coefs))
+    if monic:
+        padded.append(1.0)
+    return tuple(padded + [0.0] * (9 - len(padded)))
+
+
+# Tables are indexed by region.
+# erf: 0 -> abs(x) < 1, 1 -> abs(x) >= 1
+_ERF_NUM = (_pad(ERF_T), _pad(ERFC_P))
+_ERF_DEN = (_pad(ERF_U, monic=True), _pad(ERFC_Q, monic=True))
+
+# ndtri: 0 -> central, 1 -> tail with x < 8, 2 -> tail with x >= 8
+_NDTRI_NUM = (_pad(NDTRI_P0), _pad(NDTRI_P1), _pad(NDTRI_P2))
+_NDTRI_DEN = (
+    _pad(NDTRI_Q0, monic=True),
+    _pad(NDTRI_Q1, monic=True),
+    _pad(NDTRI_Q2, monic=True),
+)
+
+
+def _estrin_ratio(x, num, den):
+    """
+    Evaluate ``num(x) / den(x)`` with Estrin's scheme.
+
+    ``num`` and ``den`` are 9-tuples from ``_pad``. The powers of ``x`` are
+    shared between the two polynomials.
+    """
+    a0, a1, a2, a3, a4, a5, a6, a7, a8 = num
+    b0, b1, b2, b3, b4, b5, b6, b7, b8 = den
+    x2 = x * x
+    x4 = x2 * x2
+    x8 = x4 * x4
+    p = (
+        (a0 + a1 * x)
+        + (a2 + a3 * x) * x2
+        + ((a4 + a5 * x) + (a6 + a7 * x) * x2) * x4
+        + a8 * x8
+    )
+    q = (
+        (b0 + b1 * x)
+        + (b2 + b3 * x) * x2
+        + ((b4 + b5 * x) + (b6 + b7 * x) * x2) * x4
+        + b8 * x8
+    )
+    return p / q
+
+
+def erf(values):
+    """
+    Branch-free batch ``erf``. See the module docstring.
+    """
+    exp = math.exp
+    copysign = math.copysign
+    ratio = _estrin_ratio
+    num = _ERF_NUM
+    den = _ERF_DEN
+
+    result = []
+    for x in values:
+        ax = min(abs(x), ERF_CLAMP)
+        sq = ax * ax
+        r = int(ax >= 1.0)
+        t = (sq, ax)[r]
+        rat = ratio(t, num[r], den[r])
+        # Both candidates are computed; the region index picks one.
+        y = (ax * rat, 1.0 - exp(-sq) * rat)[r]
+        result.append(copysign(y, x))
+    return result
+
+
+def erfinv(values):
+    """
+    Branch-free batch ``erfinv``. See the module docstring.
+    """
+    log = math.log
+    sqrt = math.sqrt
+    copysign = math.copysign
+    ratio = _estrin_ratio
+    num = _NDTRI_NUM
+    den = _NDTRI_DEN
+
+    result = []
+    for z in values:
+        if abs(z) > 1:
+            raise ValueError("`z` must be between -1 and 1 inclusive")
+
+        y = (z + 1) / 2.0
+        yc = y - 0.5
+        # Distance to the nearer end of (0, 1). y has already been rounded,
+        # so 1 - y would lose the upper tail; (1 - z) / 2 is exact there.
+        w = min(y, (1.0 - z) / 2.0)
+
+        s = sqrt(-2.0 * log(max(w, TINY)))
+        r = int(w <= EXP_NEG2) + int(s >= 8.0)
+        inv_s = 1.0 / s
+        y2 = yc * yc
+        t = (y2, inv_s, inv_s)[r]
+        rat = ratio(t, num[r], den[r])
+
+        central = (yc + yc * (y2 * rat)) * ROOT_2PI
+        tail = copysign(s - log(s) / s - inv_s * rat, yc)
+        x = (central, tail, tail)[r] / SQRT_2
+
+        # erfinv(+-1) is +-inf.
+        result.append((x, copysign(inf, z))[int(w == 0)])
+    return result
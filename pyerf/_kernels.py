@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Generated by ``python -m pyerf._codegen``. Do not edit.
+"""
+Unrolled Horner evaluations of the cephes polynomials in ``pyerf.pyerf``.
+
+Each function evaluates one coefficient list at ``x`` with no loop, no
+indexing and no global lookups.
+"""
+
+
+def erf_t(x):
+    """Evaluate ``ERF_T`` at ``x``, like ``_polevl``."""
+    r = (9.604973739870516 * x + 90.02601972038427) * x + 2232.005345946843
+    return (r * x + 7003.325141128051) * x + 55592.30130103949
+
+
+def erf_u(x):
+    """Evaluate ``ERF_U`` at ``x``, like ``_p1evl``."""
+    r = ((x + 33.56171416475031) * x + 521.3579497801527) * x + 4594.323829709801
+    return (r * x + 22629.000061389095) * x + 49267.39426086359
+
+
+def erfc_p(x):
+    """Evaluate ``ERFC_P`` at ``x``, like ``_polevl``."""
+    r = (2.461969814735305e-10 * x + 0.5641895648310689) * x + 7.463210564422699
+    r = ((r * x + 48.63719709856814) * x + 196.5208329560771) * x + 526.4451949954773
+    r = (r * x + 934.5285271719576) * x + 1027.5518868951572
+    return r * x + 557.5353353693994
+
+
+def erfc_q(x):
+    """Evaluate ``ERFC_Q`` at ``x``, like ``_p1evl``."""
+    r = ((x + 13.228195115474499) * x + 86.70721408859897) * x + 354.9377788878199
+    r = (r * x + 975.7085017432055) * x + 1823.9091668790973
+    r = (r * x + 2246.3376081871097) * x + 1656.6630919416134
+    return r * x + 557.5353408177277
+
+
+def erfc_r(x):
+    """Evaluate ``ERFC_R`` at ``x``, like ``_polevl``."""
+    r = (0.5641895835477551 * x + 1.275366707599781) * x + 5.019050422511805
+    r = (r * x + 6.160210979930536) * x + 7.4097426995044895
+    return r * x + 2.9788666537210022
+
+
+def erfc_s(x):
+    """Evaluate ``ERFC_S`` at ``x``, like ``_p1evl``."""
+    r = ((x + 2.2605286322011726) * x + 9.396035249380015) * x + 12.048953980809666
+    return ((r * x + 17.08144507475659) * x + 9.608968090632859) * x + 3.369076451000815
+
+
+def ndtri_p0(x):
+    """Evaluate ``NDTRI_P0`` at ``x``, like ``_polevl``."""
+    r = (-59.96335010141079 * x + 98.00107541859997) * x - 56.67628574690703
+    return (r * x + 13.931260938727968) * x - 1.2391658386738125
+
+
+def ndtri_q0(x):
+    """Evaluate ``NDTRI_Q0`` at ``x``, like ``_p1evl``."""
+    r = ((x + 1.9544885833814176) * x + 4.676279128988815) * x + 86.36024213908905
+    r = (r * x - 225.46268785411937) * x + 200.26021238006066
+    return ((r * x - 82.03722561683334) * x + 15.90562251262117) * x - 1.1833162112133
+
+
+def ndtri_p1(x):
+    """Evaluate ``NDTRI_P1`` at ``x``, like ``_polevl``."""
+    r = (4.0554489230596245 * x + 31.525109459989388) * x + 57.16281922464213
+    r = (r * x + 44.08050738932008) * x + 14.684956192885803
+    r = (r * x + 2.1866330685079025) * x - 0.1402560791713545
+    return (r * x - 0.03504246268278482) * x - 0.0008574567851546854
+
+
+def ndtri_q1(x):
+    """Evaluate ``NDTRI_Q1`` at ``x``, like ``_p1evl``."""
+    r = ((x + 15.779988325646675) * x + 45.39076351288792) * x + 41.3172038254672
+    r = (r * x + 15.04253856929075) * x + 2.504649462083094
+    r = (r * x - 0.14218292285478779) * x - 0.03808064076915783
+    return r * x - 0.0009332594808954574
+
+
+def ndtri_p2(x):
+    """Evaluate ``NDTRI_P2`` at ``x``, like ``_polevl``."""
+    r = (3.2377489177694603 * x + 6.915228890689842) * x + 3.9388102529247444
+    r = (r * x + 1.3330346081580755) * x + 0.20148538954917908
+    r = (r * x + 0.012371663481782003) * x + 0.00030158155350823543
+    return (r * x + 2.6580697468673755e-06) * x + 6.239745391849833e-09
+
+
+def ndtri_q2(x):
+    """Evaluate ``NDTRI_Q2`` at ``x``, like ``_p1evl``."""
+    r = ((x + 6.02427039364742) * x + 3.6798356385616087) * x + 1.3770209948908132
+    r = (r * x + 0.21623699359449663) * x + 0.013420400608854318
+    r = (r * x + 0.00032801446468212774) * x + 2.8924786474538068e-06
+    return r * x + 6.790194080099813e-09
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Region-partitioned batch kernels for ``erfinv`` and ``erfcinv``.
+
+``_ndtri`` uses one of three rational approximations depending on where
+its argument falls. Rather than choosing per item, these kernels make one
+pass that sorts the indexes into those regions (handling special values
+on the spot) and then run a tight loop per region with that region's
+coefficients bound to local variables and its polynomials unrolled in
+Horner form. Results are written straight back to their original
+positions.
+
+Two of the intermediate values are also computed more carefully than in
+the scalar functions: ``erfinv`` takes ``y - 0.5`` as ``z / 2`` and the
+upper tail ``1 - y`` as ``(1 - z) / 2``, both of which are exact. This
+keeps full relative precision for tiny ``z`` and gives finite results for
+``z`` just below 1, where ``(z + 1) / 2`` rounds to 1.
+"""
+
+import math
+
+from .pyerf import EXP_NEG2
+from .pyerf import NDTRI_P0
+from .pyerf import NDTRI_P1
+from .pyerf import NDTRI_P2
+from .pyerf import NDTRI_Q0
+from .pyerf import NDTRI_Q1
+from .pyerf import NDTRI_Q2
+from .pyerf import ROOT_2PI
+from .pyerf import inf
+
+SQRT_2 = math.sqrt(2)
+
+# _ndtri uses its central approximation for EXP_NEG2 < y <= UPPER.
+UPPER = 1 - EXP_NEG2
+
+
+def _central(result, indexes, offsets, sign):
+    """
+    Set ``result[i] = sign * _ndtri(0.5 + yc) / sqrt(2)`` for each index
+    ``i`` and offset ``yc`` with ``abs(yc) < 0.5 - EXP_NEG2``.
+    """
+    p0, p1, p2, p3, p4 = NDTRI_P0
+    q0, q1, q2, q3, q4, q5, q6, q7 = NDTRI_Q0
+    scale = sign * ROOT_2PI
+
+    for i, yc in zip(indexes, offsets):
+        t = yc * yc
+        p = (((p0 * t + p1) * t + p2) * t + p3) * t + p4
+        q = (((t + q0) * t + q1) * t + q2) * t + q3
+        q = (((q * t + q4) * t + q5) * t + q6) * t + q7
+        result[i] = (yc + yc * (t * p / q)) * scale / SQRT_2
+
+
+def _tail(result, part, num, den):
+    """
+    Set ``result[i] = sign * (s - log(s) / s - P(1/s) / (s * Q(1/s))) / sqrt(2)``
+    for each index ``i``, ``s = sqrt(-2 * log(w))`` and sign in ``part``.
+
+    ``num`` and ``den`` are a pair of the degree 8 cephes tail coefficient
+    sets.
+    """
+    log = math.log
+    indexes, roots, signs = part
+    p0, p1, p2, p3, p4, p5, p6, p7, p8 = num
+    q0, q1, q2, q3, q4, q5, q6, q7 = den
+
+    for i, s, sign in zip(indexes, roots, signs):
+        z = 1.0 / s
+        p = (((p0 * z + p1) * z + p2) * z + p3) * z + p4
+        p = (((p * z + p5) * z + p6) * z + p7) * z + p8
+        q = (((z + q0) * z + q1) * z + q2) * z + q3
+        q = (((q * z + q4) * z + q5) * z + q6) * z + q7
+        result[i] = sign * ((s - log(s) / s) - z * p / q) / SQRT_2
+
+
+class _Partitions(object):
+    """
+    Indexes and arguments for each ``_ndtri`` region.
+    """
+
+    __slots__ = ("central", "offsets", "near", "far")
+
+    def __init__(self):
+        self.central = []
+        self.offsets = []
+        # (indexes, roots, signs) for s < 8 and s >= 8.
+        self.near = ([], [], [])
+        self.far = ([], [], [])
+
+    def add_tail(self, i, w, sign):
+        s = math.sqrt(-2.0 * math.log(w))
+        indexes, roots, signs = self.near if s < 8.0 else self.far
+        indexes.append(i)
+        roots.append(s)
+        signs.append(sign)
+
+    def evaluate(self, result, sign):
+        _central(result, self.central, self.offsets, sign)
+        _tail(result, self.near, NDTRI_P1, NDTRI_Q1)
+        _tail(result, self.far, NDTRI_P2, NDTRI_Q2)
+        return result
+
+
+def erfinv(values):
+    """
+    Region-partitioned batch ``erfinv``. See the module docstring.
+    """
+    result = []
+    parts = _Partitions()
+    central, offsets = parts.central, parts.offsets
+    add_tail = parts.add_tail
+
+    for i, z in enumerate(values):
+        result.append(None)
+        if abs(z) > 1:
+            raise ValueError("`z` must be between -1 and 1 inclusive")
+        if z == 0:
+            result[i] = 0
+            continue
+        y = (z + 1) / 2.0
+        if y > UPPER:
+            if z == 1:
+                result[i] = inf
+            else:
+                add_tail(i, (1 - z) / 2.0, 1.0)
+        elif y > EXP_NEG2:
+            central.append(i)
+            offsets.append(z / 2.0)
+        elif z == -1:
+            result[i] = -inf
+        elif y == y:
+            add_tail(i, y, -1.0)
+        else:
+            result[i] = y
+
+    return parts.evaluate(result, 1.0)
+
+
+def erfcinv(values):
+    """
+    Region-partitioned batch ``erfcinv``. See the module docstring.
+    """
+    result = []
+    parts = _Partitions()
+    central, offsets = parts.central, parts.offsets
+    add_tail = parts.add_tail
+
+    for i, z in enumerate(values):
+        result.append(None)
+        if z < 0 or z > 2:
+            raise ValueError("`z` must be between 0 and 2 inclusive")
+        if z == 1:
+            result[i] = 0
+            continue
+        # erfcinv(z) = -ndtri(z / 2) / sqrt(2)
+        y = z / 2.0
+        if y > UPPER:
+            if z == 2:
+                result[i] = -inf
+            else:
+                add_tail(i, 1 - y, -1.0)
+        elif y > EXP_NEG2:
+            central.append(i)
+            offsets.append(y - 0.5)
+        elif y == 0:
+            # Includes the smallest subnormal, which underflows when halved.
+            result[i] = inf
+        elif y == y:
+            add_tail(i, y, 1.0)
+        else:
+            result[i] = y
+
+    return parts.evaluate(result, -1.0)
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+High-precision reference implementations, built on ``decimal``.
+
+These are far too slow for general use. They exist to build exactly
+rounded lookup tables and to measure the accuracy of the fast paths.
+"""
+
+import decimal
+import math
+
+from . import pyerf
+
+D = decimal.Decimal
+
+# Number of significant digits carried in results.
+DIGITS = 40
+
+PI = D("3.14159265358979323846264338327950288419716939937510582097494459")
+
+# Below this, erf comes from its power series; above it erfc comes from
+# its continued fraction.
+SERIES_LIMIT = 3
+
+LN_10 = math.log(10)
+
+
+def _context(digits):
+    return decimal.Context(prec=digits, Emin=-9999999, Emax=9999999)
+
+
+def _erf_series(x):
+    """
+    erf(x) = 2 / sqrt(pi) * exp(-x**2) * sum(2**n * x**(2n+1) / (2n+1)!!)
+
+    Every term is positive, so there is no cancellation. Uses the current
+    decimal context.
+    """
+    x2 = x * x
+    two_x2 = 2 * x2
+    term = total = x
+    tol = x.scaleb(-(decimal.getcontext().prec + 2))
+    n = 0
+    while term > tol:
+        n += 1
+        term = term * two_x2 / (2 * n + 1)
+        total += term
+    return 2 / PI.sqrt() * (-x2).exp() * total
+
+
+def _erfc_fraction(x):
+    """
+    erfc(x) = exp(-x**2) / sqrt(pi) / (x + (1/2) / (x + 1 / (x + (3/2) / ...)))
+
+    Evaluated with the modified Lentz algorithm, in the current decimal
+    context. Only used for x >= SERIES_LIMIT, where it converges quickly.
+    """
+    prec = decimal.getcontext().prec
+    tiny = D(1).scaleb(-2 * prec)
+    eps = D(1).scaleb(-(prec + 2))
+    f = c = x
+    d = D(0)
+    k = 0
+    while True:
+        k += 1
+        a = D(k) / 2
+        d = x + a * d
+        if d == 0:
+            d = tiny
+        c = x + a / c
+        if c == 0:
+            c = tiny
+        d = 1 / d
+        delta = c * d
+        f *= delta
+        if abs(delta - 1) < eps:
+            break
+    return (-x * x).exp() / (PI.sqrt() * f)
+
+
+def _guard_digits(x):
+    """
+    Extra digits needed to survive the cancellation in 1 - erf(x).
+    """
+    return 5 + int(float(x) ** 2 / LN_10)
+
+
+def erf(x, digits=DIGITS):
+    """
+    Return erf(x) as a Decimal with ``digits`` significant digits.
+    """
+    x = D(x)
+    if x == 0:
+        return D(0)
+    ax = x.copy_abs()
+    with decimal.localcontext(_context(digits + 5)):
+        if ax < SERIES_LIMIT:
+            result = _erf_series(ax)
+        else:
+            result = 1 - _erfc_fraction(ax)
+    result = _context(digits).plus(result)
+    return result if x > 0 else result.copy_negate()
+
+
+def erfc(x, digits=DIGITS):
+    """
+    Return erfc(x) as a Decimal with ``digits`` significant digits.
+    """
+    x = D(x)
+    ax = x.copy_abs()
+    if ax < SERIES_LIMIT:
+        with decimal.localcontext(_context(digits + _guard_digits(ax))):
+            tail = 1 - _erf_series(ax)
+    else:
+        with decimal.localcontext(_context(digits + 5)):
+            tail = _erfc_fraction(ax)
+    if x < 0:
+        tail = _context(digits + 5).subtract(2, tail)
+    return _context(digits).plus(tail)
+
+
+def _newton(x, residual, digits):
+    """
+    Two Newton steps on a function whose derivative is
+    ``-2 / sqrt(pi) * exp(-x**2)``, starting from the Decimal ``x``.
+    """
+    with decimal.localcontext(_context(digits + 5)):
+        for _ in range(2):
+            x += residual(x) * PI.sqrt() / 2 * (x * x).exp()
+    return _context(digits).plus(x)
+
+
+def erfcinv(q, start=None, digits=DIGITS):
+    """
+    Return erfcinv(q) as a Decimal, by Newton's method on ``erfc``.
+
+    Parameters
+    ----------
+    q : numeric
+        Must be strictly between 0 and 2.
+    start : float, optional
+        An initial guess. Defaults to ``pyerf.erfcinv(q)``, which is close
+        enough that two iterations reach full precision.
+    digits : int, optional
+    """
+    q = D(q)
+    if start is None:
+        start = pyerf.erfcinv(float(q))
+    return _newton(D(start), lambda x: erfc(x, digits + 5) - q, digits)
+
+
+def erfinv(z, start=None, digits=DIGITS):
+    """
+    Return erfinv(z) as a Decimal, by Newton's method.
+
+    Near zero the iteration uses ``erf`` so that tiny results keep their
+    relative precision. Elsewhere it uses ``erfc`` on the exact ``1 - abs(z)``.
+
+    Parameters
+    ----------
+    z : numeric
+        Must be strictly between -1 and 1.
+    start : float, optional
+        An initial guess. Defaults to the double precision result.
+    digits : int, optional
+    """
+    z = D(z)
+    if z < 0:
+        if start is not None:
+            start = -start
+        return erfinv(z.copy_negate(), start, digits).copy_negate()
+    if z == 0:
+        return D(0)
+
+    if z >= D("0.5"):
+        q = _context(digits + 400).subtract(1, z)
+        if start is None:
+            start = pyerf.erfcinv(float(q))
+        return erfcinv(q, start, digits)
+
+    if start is None:
+        start = pyerf.erfinv(float(z))
+    return _newton(D(start), lambda x: z - erf(x, digits + 5), digits)
+
+
+def ndtri(p, digits=DIGITS):
+    """
+    Return the inverse of the standard normal CDF at ``p`` as a Decimal.
+
+    Uses ``ndtri(p) = -sqrt(2) * erfcinv(2 * p)``, which is exact to form.
+    Above 0.5 it uses ``ndtri(p) = -ndtri(1 - p)`` instead, since ``1 - p`` is
+    then exact too.
+
+    Parameters
+    ----------
+    p : numeric
+        Must be strictly between 0 and 1.
+    digits : int, optional
+    """
+    p = D(p)
+    if p > D("0.5"):
+        return ndtri(_context(digits + 400).subtract(1, p), digits).copy_negate()
+    root = erfcinv(_context(digits + 400).multiply(2, p), digits=digits + 5)
+    with decimal.localcontext(_context(digits + 5)):
+        result = -D(2).sqrt() * root
+    return _context(digits).plus(result)
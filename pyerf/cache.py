@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+An opt-in, on-disk cache for batch results.
+
+Results are stored as raw float64 files behind a small header, so they can
+be memory-mapped and reloaded at I/O speed instead of being recomputed.
+
+>>> from pyerf import batch
+>>> cache = DiskCache("/tmp/pyerf-cache")          # doctest: +SKIP
+>>> cache.apply(batch.erfinv, quantiles)            # doctest: +SKIP
+>>> cache.apply(batch.erfinv, quantiles, method="estrin")  # doctest: +SKIP
+
+Entries are keyed by a SHA-256 hash of the input values (as float64), the
+function, its keyword arguments (such as ``method``, with the default
+filled in) and the PyErf version. Functions other than those in
+``pyerf.batch`` must be given a ``name``.
+Each file also carries a hash of its data, which is checked on every load.
+Files that fail the check are deleted and recomputed. Once the cache grows
+past ``max_bytes`` the least recently used entries are removed.
+"""
+
+import array
+import hashlib
+import inspect
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from . import batch
+from .__about__ import __version__
+
+__all__ = [
+    "DiskCache",
+    "default_directory",
+    "map_file",
+    "write_file",
+]
+
+DEFAULT_MAX_BYTES = 1 << 30
+
+SUFFIX = ".f64"
+
+# Header: magic, item count, SHA-256 of the data. 48 bytes, so the float64
+# data that follows stays 8-byte aligned.
+MAGIC = b"PYERF\x00\x01\x00"
+HEADER = struct.Struct("<8sQ32s")
+
+
+def default_directory():
+    """
+    Return the default cache directory.
+
+    This is ``$PYERF_CACHE_DIR`` if set, otherwise ``pyerf`` inside
+    ``$XDG_CACHE_HOME`` (default ``~/.cache``).
+    """
+    directory = os.environ.get("PYERF_CACHE_DIR")
+    if directory:
+        return directory
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return os.path.join(os.path.expanduser(base), "pyerf")
+
+
+def _to_doubles(values):
+    """
+    Convert ``values`` to a native float64 ``array.array``.
+    """
+    if isinstance(values, array.array) and values.typecode == "d":
+        return values
+    return array.array("d", values)
+
+
+def write_file(path, values):
+    """
+    Atomically write ``values`` to ``path`` as a header plus float64 data.
+    """
+    data = _to_doubles(values).tobytes()
+    header = HEADER.pack(MAGIC, len(data) // 8, hashlib.sha256(data).digest())
+    directory = os.path.dirname(path) or os.curdir
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def map_file(f):
+    """
+    Memory-map and verify a file written by :func:`write_file`.
+
+    Parameters
+    ----------
+    f : file
+        An open, readable binary file. It can be closed once this returns.
+
+    Returns
+    -------
+    (mmap.mmap, memoryview) or None
+        The mapping and a float64 view of the data, or None if the file
+        fails the integrity check. The caller must release the view and
+        close the mapping when done.
+    """
+    size = os.fstat(f.fileno()).st_size
+    if size < HEADER.size:
+        return None
+
+    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, count, digest = HEADER.unpack_from(mapped)
+    if magic == MAGIC and size == HEADER.size + 8 * count:
+        view = memoryview(mapped)[HEADER.size :]
+        if hashlib.sha256(view).digest() == digest:
+            return mapped, view.cast("d")
+        view.release()
+    mapped.close()
+    return None
+
+
+def _identify(func, kwargs, name):
+    """
+    Return the name and keyword arguments that identify ``func`` in a
+    cache key.
+
+    The public ``pyerf.batch`` functions are recognized, and their default
+    ``method`` is filled in so that entries don't outlive a change of
+    default. Any other callable must be given a ``name``: lambdas and
+    closures can't be told apart reliably.
+    """
+    if name is not None:
+        return name, kwargs
+
+    name = getattr(func, "__name__", None)
+    if name not in batch._KERNELS or getattr(batch, name) is not func:
+        msg = "Pass name= to cache {!r}; only pyerf.batch functions are recognized"
+        raise TypeError(msg.format(func))
+
+    kwargs = dict(kwargs)
+    method = inspect.signature(func).parameters["method"].default
+    kwargs.setdefault("method", method)
+    return "pyerf.batch." + name, kwargs
+
+
+class DiskCache(object):
+    """
+    A size-bounded, least-recently-used cache of batch results on disk.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Where to keep the cache files. Defaults to
+        :func:`default_directory`. Created if it doesn't exist.
+    max_bytes : int, optional
+        The maximum total size of the cache files. Defaults to 1 GiB.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        if directory is None:
+            directory = default_directory()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def key(self, func, values, kwargs, name=None):
+        """
+        Return the cache key for ``func(values, **kwargs)``.
+
+        ``values`` must already be a float64 ``array.array``. See
+        :meth:`apply` for ``name``.
+        """
+        name, kwargs = _identify(func, kwargs, name)
+        h = hashlib.sha256()
+        header = "{}\0{}\0{!r}\0{}\0".format(
+            __version__,
+            name,
+            sorted(kwargs.items()),
+            sys.byteorder,
+        )
+        h.update(header.encode("utf-8"))
+        h.update(values.tobytes())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def _load(self, path):
+        """
+        Load a cache file. Returns None if the file is missing. Corrupt
+        files are deleted and also return None.
+        """
+        try:
+            f = open(path, "rb")
+        except (IOError, OSError):
+            return None
+
+        with f:
+            mapping = map_file(f)
+        if mapping is None:
+            result = None
+        else:
+            mapped, view = mapping
+            result = view.tolist()
+            view.release()
+            mapped.close()
+
+        # Another process may have evicted the file since it was opened.
+        try:
+            if result is None:
+                os.remove(path)
+            else:
+                # Mark as recently used.
+                os.utime(path, None)
+        except OSError:
+            pass
+        return result
+
+    def _entries(self):
+        """
+        Return ``(mtime, size, path)`` for each cache file, oldest first.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def _evict(self, keep=None):
+        """
+        Remove least recently used files until the cache fits in
+        ``max_bytes``. The file ``keep`` is removed last.
+        """
+        entries = self._entries()
+        entries.sort(key=lambda entry: entry[2] == keep)
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def size(self):
+        """
+        Return the total size of the cache files, in bytes.
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self):
+        """
+        Remove every cache file.
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def apply(self, func, values, name=None, **kwargs):
+        """
+        Return ``func(values, **kwargs)``, from the cache if possible.
+
+        Parameters
+        ----------
+        func : callable
+            A batch function, such as :func:`pyerf.batch.erfinv`.
+        values : iterable of numeric
+        name : str, optional
+            Identifies ``func`` in the cache key. Required unless ``func`` is
+            one of the ``pyerf.batch`` functions. Two callables given the
+            same name share cache entries.
+        **kwargs
+            Passed on to ``func`` and included in the cache key.
+
+        Returns
+        -------
+        list of float
+
+        Raises
+        ------
+        TypeError
+            If ``func`` isn't a ``pyerf.batch`` function and no ``name`` is
+            given.
+        """
+        values = _to_doubles(values)
+        path = self._path(self.key(func, values, kwargs, name))
+
+        result = self._load(path)
+        if result is not None:
+            return result
+
+        # Missing or corrupt: (re)compute.
+        result = func(values, **kwargs)
+        if HEADER.size + 8 * len(result) <= self.max_bytes:
+            write_file(path, result)
+            self._evict(keep=path)
+        return result
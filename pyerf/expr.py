@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""
+Lazy expressions over batches.
+
+Build an expression from the placeholder ``x``, the functions in this
+module and ordinary arithmetic. Nothing is computed until the expression
+is evaluated:
+
+>>> f = erf(erfinv(x) * 0.5)
+>>> f
+erf((erfinv(x) * 0.5))
+>>> [round(y, 12) for y in f.evaluate([0.1, 0.5])]
+[0.050098659747, 0.26406768879]
+
+Before evaluation the expression is simplified:
+
++ Constant sub-expressions are folded.
++ ``erf(erfinv(u))`` and ``erfc(erfcinv(u))`` become ``u``.
++ ``erfinv(1 - u)`` becomes ``erfcinv(u)`` and ``erfinv(2 * u - 1)`` becomes
+  ``ndtri(u) / sqrt(2)``. Both avoid cancellation as well as work, and the
+  common ``erfinv(2 * p - 1) * sqrt(2)`` ends up as plain ``ndtri(p)``.
+
+>>> (erfinv(2 * x - 1) * math.sqrt(2)).simplify()
+ndtri(x)
+
+Whatever remains is compiled into a single Python function that loops over
+the batch once, so there are no intermediate lists and no per-node call
+overhead.
+
+Note that simplification removes the domain checks of the functions it
+eliminates: ``erf(erfinv(x))`` evaluated at 2 returns 2 rather than raising.
+"""
+
+import math
+
+from . import pyerf
+
+__all__ = [
+    "Expr",
+    "x",
+    "erf",
+    "erfc",
+    "erfinv",
+    "erfcinv",
+    "ndtri",
+]
+
+SQRT_2 = math.sqrt(2)
+
+# The functions that can appear in a Call node.
+FUNCTIONS = ("erf", "erfc", "erfinv", "erfcinv", "ndtri")
+
+
+def _wrap(value):
+    """
+    Turn ``value`` into an Expr, or return None if that isn't possible.
+    """
+    if isinstance(value, Expr):
+        return value
+    if isinstance(value, (int, float)):
+        return Const(value)
+    return None
+
+
+def _is_const(node, value=None):
+    """
+    Is ``node`` a Const (with ``value``, if given)?
+    """
+    if not isinstance(node, Const):
+        return False
+    return value is None or node.value == value
+
+
+class Expr(object):
+    """
+    Base class for all expression nodes.
+
+    Nodes are immutable. Arithmetic with other nodes or with numbers
+    builds new nodes.
+    """
+
+    # The compiled batch function, filled in by the first compile().
+    __slots__ = ("_compiled",)
+
+    def _binop(self, op, other, reflected=False):
+        other = _wrap(other)
+        if other is None:
+            return NotImplemented
+        if reflected:
+            return BinOp(op, other, self)
+        return BinOp(op, self, other)
+
+    def __add__(self, other):
+        return self._binop("+", other)
+
+    def __radd__(self, other):
+        return self._binop("+", other, reflected=True)
+
+    def __sub__(self, other):
+        return self._binop("-", other)
+
+    def __rsub__(self, other):
+        return self._binop("-", other, reflected=True)
+
+    def __mul__(self, other):
+        return self._binop("*", other)
+
+    def __rmul__(self, other):
+        return self._binop("*", other, reflected=True)
+
+    def __truediv__(self, other):
+        return self._binop("/", other)
+
+    def __rtruediv__(self, other):
+        return self._binop("/", other, reflected=True)
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+    def __neg__(self):
+        return BinOp("*", Const(-1), self)
+
+    def _simplify_once(self):
+        """
+        Apply the rewrite rules to this node, assuming that its children
+        have already been simplified.
+        """
+        return self
+
+    def simplify(self):
+        """
+        Return an equivalent, simplified expression.
+        """
+        return self._simplify_once()
+
+    def _source(self, namespace):
+        """
+        Return Python source for this node. Any objects the source refers
+        to are added to ``namespace``.
+        """
+        raise NotImplementedError
+
+    def compile(self):
+        """
+        Simplify the expression and compile it into a batch function.
+
+        Compiling is much more expensive than evaluating a single item, so
+        the function is only built the first time and then cached on the
+        node. Evaluating the same expression on many batches pays for it
+        once.
+
+        Returns
+        -------
+        callable
+            Takes an iterable of numbers and returns a list of floats.
+        """
+        try:
+            return self._compiled
+        except AttributeError:
+            pass
+        namespace = {}
+        body = self.simplify()._source(namespace)
+        source = "def _fused(values):\n    return [{} for x in values]\n"
+        exec(source.format(body), namespace)
+        self._compiled = namespace["_fused"]
+        return self._compiled
+
+    def evaluate(self, values):
+        """
+        Evaluate the expression for each item in ``values``.
+
+        Parameters
+        ----------
+        values : iterable of numeric
+
+        Returns
+        -------
+        list of float
+        """
+        return self.compile()(values)
+
+    __call__ = evaluate
+
+
+class Var(Expr):
+    """
+    The batch item. Use the module-level ``x`` rather than creating these.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "x"
+
+    def _source(self, namespace):
+        return "x"
+
+
+class Const(Expr):
+    """
+    A constant number.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return repr(self.value)
+
+    def _source(self, namespace):
+        # Bind by name: repr() isn't valid source for inf or nan.
+        name = "_c{}".format(len(namespace))
+        namespace[name] = self.value
+        return name
+
+
+class BinOp(Expr):
+    """
+    An arithmetic operation: ``left op right``.
+    """
+
+    __slots__ = ("op", "left", "right")
+
+    _OPERATORS = {
+        "+": lambda a, b: a + b,
+        "-": lambda a, b: a - b,
+        "*": lambda a, b: a * b,
+        "/": lambda a, b: a / b,
+    }
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def __repr__(self):
+        return "({!r} {} {!r})".format(self.left, self.op, self.right)
+
+    def simplify(self):
+        node = BinOp(self.op, self.left.simplify(), self.right.simplify())
+        return node._simplify_once()
+
+    def _simplify_once(self):
+        op, left, right = self.op, self.left, self.right
+
+        if _is_const(left) and _is_const(right):
+            return Const(self._OPERATORS[op](left.value, right.value))
+
+        # Identities
+        if op == "+" and _is_const(left, 0):
+            return right
+        if op in "+-" and _is_const(right, 0):
+            return left
+        if op == "*" and _is_const(left, 1):
+            return right
+        if op in "*/" and _is_const(right, 1):
+            return left
+
+        # Keep constants on the right of a product.
+        if op == "*" and _is_const(left):
+            return BinOp(op, right, left)._simplify_once()
+
+        # Merge constant factors: (u * a) * b -> u * (a * b), and cancel
+        # (u / a) * a -> u.
+        if op == "*" and _is_const(right) and isinstance(left, BinOp):
+            if left.op == "*" and _is_const(left.right):
+                factor = left.right.value * right.value
+                return BinOp("*", left.left, Const(factor))._simplify_once()
+            if left.op == "/" and _is_const(left.right, right.value):
+                return left.left
+
+        return self
+
+    def _source(self, namespace):
+        left = self.left._source(namespace)
+        right = self.right._source(namespace)
+        return "({} {} {})".format(left, self.op, right)
+
+
+def _match_affine(node, scale, offset):
+    """
+    If ``node`` is ``scale * u + offset`` (written as a sum or difference,
+    with the product in either order), return ``u``. Otherwise None.
+    """
+    if not isinstance(node, BinOp) or not _is_const(node.right):
+        return None
+    if node.op == "-":
+        found_offset = -node.right.value
+    elif node.op == "+":
+        found_offset = node.right.value
+    else:
+        return None
+    if found_offset != offset:
+        return None
+
+    term = node.left
+    if scale == 1:
+        return term
+    if isinstance(term, BinOp) and term.op == "*":
+        if _is_const(term.right, scale):
+            return term.left
+        if _is_const(term.left, scale):
+            return term.right
+    return None
+
+
+class Call(Expr):
+    """
+    A call to one of the functions in ``FUNCTIONS``.
+    """
+
+    __slots__ = ("name", "arg")
+
+    def __init__(self, name, arg):
+        self.name = name
+        self.arg = arg
+
+    def __repr__(self):
+        return "{}({!r})".format(self.name, self.arg)
+
+    def simplify(self):
+        return Call(self.name, self.arg.simplify())._simplify_once()
+
+    def _simplify_once(self):
+        name, arg = self.name, self.arg
+
+        if _is_const(arg):
+            return Const(getattr(pyerf, name)(arg.value))
+
+        # erf(erfinv(u)) -> u and erfc(erfcinv(u)) -> u
+        if isinstance(arg, Call) and arg.name == name + "inv":
+            return arg.arg
+
+        if name == "erfinv":
+            # erfinv(1 - u) -> erfcinv(u)
+            if isinstance(arg, BinOp) and arg.op == "-" and _is_const(arg.left, 1):
+                return Call("erfcinv", arg.right)
+            # erfinv(2 * u - 1) -> ndtri(u) / sqrt(2)
+            inner = _match_affine(arg, 2, -1)
+            if inner is not None:
+                return BinOp("/", Call("ndtri", inner), Const(SQRT_2))
+
+        return self
+
+    def _source(self, namespace):
+        name = "_" + self.name
+        namespace[name] = getattr(pyerf, self.name)
+        return "{}({})".format(name, self.arg._source(namespace))
+
+
+def _function(name):
+    def func(arg):
+        wrapped = _wrap(arg)
+        if wrapped is None:
+            msg = "{}() expects an expression or a number, not {!r}"
+            raise TypeError(msg.format(name, arg))
+        return Call(name, wrapped)
+
+    func.__name__ = name
+    func.__doc__ = "Lazy version of :func:`pyerf.pyerf.{}`.".format(name)
+    return func
+
+
+erf = _function("erf")
+erfc = _function("erfc")
+erfinv = _function("erfinv")
+erfcinv = _function("erfcinv")
+ndtri = _function("ndtri")
+
+# The batch item.
+x = Var()
@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+"""
+Accuracy versus speed of every way PyErf can evaluate a function.
+
+For each function this sweeps inputs across every region of the cephes
+approximations (and the points where they switch from one to another),
+measures the error of each backend in ULPs against ``pyerf._reference``,
+times each backend on the same inputs and marks the backends that are on
+the Pareto front: no other backend is both at least as accurate and at
+least as fast.
+
+The backends are:
+
++ every ``method`` that ``pyerf.batch`` offers for the function;
++ ``"cephes"`` for ``erf`` and ``erfc``, the pure Python ports, when the
+  ``"scalar"`` method uses the C versions from ``math`` instead;
++ ``"scalar"`` for ``ndtri``, which has no batch version.
+
+Run it from the command line::
+
+    python -m pyerf.pareto --samples 2000 --format csv
+
+or from Python:
+
+>>> rows = report(["erfc"], samples=200)          # doctest: +SKIP
+>>> [(r["backend"], round(r["max_ulp"], 1), r["pareto"]) for r in rows]  # doctest: +SKIP
+[('cephes', 372.1, False), ('scalar', 1.9, True)]
+"""
+
+import argparse
+import csv
+import json
+import math
+import random
+import struct
+import sys
+import timeit
+
+from . import _reference
+from . import batch
+from . import pyerf
+
+__all__ = [
+    "FUNCTIONS",
+    "backends",
+    "report",
+    "sweep",
+    "ulp_error",
+    "write_csv",
+    "write_json",
+]
+
+FUNCTIONS = ("erf", "erfc", "erfinv", "erfcinv", "ndtri")
+
+# Where _ndtri switches from the central to the tail approximation, and
+# from the tail to the far tail.
+NDTRI_TAIL = pyerf.EXP_NEG2
+NDTRI_FAR_TAIL = math.exp(-32)
+
+# Input regions for each function: ``(name, sampler)``, where ``sampler``
+# maps a uniform variate in [0, 1) to an input.
+_REGIONS = {
+    "erf": [
+        ("abs(x) <= 1", lambda u: _linear(u, 0, 1)),
+        ("1 < abs(x) < 8", lambda u: _linear(u, 1, 8)),
+        ("abs(x) >= 8", lambda u: _log(u, 8, 1e3)),
+        ("tiny", lambda u: _log(u, 1e-300, 1e-8)),
+    ],
+    "erfc": [
+        ("x < -1", lambda u: -_log(u, 1, 10)),
+        ("abs(x) < 1", lambda u: _linear(u, -1, 1)),
+        ("1 <= x < 8", lambda u: _linear(u, 1, 8)),
+        ("8 <= x", lambda u: _linear(u, 8, 26.5)),
+    ],
+    "erfinv": [
+        ("central", lambda u: _linear(u, 0, 1 - 2 * NDTRI_TAIL)),
+        ("tail", lambda u: 1 - _log(u, 2**-52, 2 * NDTRI_TAIL)),
+        ("tiny", lambda u: _log(u, 1e-300, 1e-8)),
+    ],
+    "erfcinv": [
+        ("central", lambda u: _linear(u, 2 * NDTRI_TAIL, 2 - 2 * NDTRI_TAIL)),
+        ("tail", lambda u: _log(u, 2 * NDTRI_FAR_TAIL, 2 * NDTRI_TAIL)),
+        ("far tail", lambda u: _log(u, 1e-300, 2 * NDTRI_FAR_TAIL)),
+        ("upper tail", lambda u: 2 - _log(u, 2**-51, 2 * NDTRI_TAIL)),
+    ],
+    "ndtri": [
+        ("central", lambda u: _linear(u, NDTRI_TAIL, 1 - NDTRI_TAIL)),
+        ("tail", lambda u: _log(u, NDTRI_FAR_TAIL, NDTRI_TAIL)),
+        ("far tail", lambda u: _log(u, 1e-300, NDTRI_FAR_TAIL)),
+        ("upper tail", lambda u: 1 - _log(u, 2**-53, NDTRI_TAIL)),
+    ],
+}
+
+# Points where an implementation switches formulas. Inputs a few ULPs
+# either side of each are always included.
+_BOUNDARIES = {
+    "erf": [1.0, 6.0, 8.0],
+    "erfc": [1.0, 8.0],
+    "erfinv": [1 - 2 * NDTRI_TAIL, 2 * NDTRI_TAIL - 1],
+    "erfcinv": [2 * NDTRI_TAIL, 1.0, 2 * NDTRI_FAR_TAIL, 2 - 2 * NDTRI_TAIL],
+    "ndtri": [NDTRI_TAIL, 0.5, NDTRI_FAR_TAIL, 1 - NDTRI_TAIL],
+}
+
+# Functions that are odd, so the sweep covers negative inputs by symmetry.
+_ODD = ("erf", "erfinv")
+
+_REFERENCES = {
+    "erf": _reference.erf,
+    "erfc": _reference.erfc,
+    "erfinv": _reference.erfinv,
+    "erfcinv": _reference.erfcinv,
+    "ndtri": _reference.ndtri,
+}
+
+_DOUBLE = struct.Struct("<d")
+_INT64 = struct.Struct("<q")
+
+
+def _linear(u, lo, hi):
+    return lo + u * (hi - lo)
+
+
+def _log(u, lo, hi):
+    return math.exp(_linear(u, math.log(lo), math.log(hi)))
+
+
+def _next_after(x, steps):
+    """
+    Return the double ``steps`` ULPs above ``x`` (below if negative).
+    Only valid for finite, positive ``x``.
+    """
+    bits = _INT64.unpack(_DOUBLE.pack(x))[0]
+    return _DOUBLE.unpack(_INT64.pack(bits + steps))[0]
+
+
+def _ulp(x):
+    """
+    Return the gap between ``abs(x)`` and the next larger double.
+    """
+    if x == 0:
+        return 5e-324
+    exponent = math.frexp(x)[1]
+    return math.ldexp(1.0, max(exponent - 53, -1074))
+
+
+def ulp_error(computed, exact):
+    """
+    Return the error of ``computed`` in units in the last place of the
+    correctly rounded result.
+
+    Parameters
+    ----------
+    computed : float
+    exact : decimal.Decimal
+
+    Returns
+    -------
+    float
+        0 for an exactly rounded result. ``inf`` if ``computed`` is
+        infinite or NaN but the exact value isn't.
+    """
+    rounded = float(exact)
+    if math.isinf(computed) or math.isnan(computed):
+        return 0.0 if computed == rounded else float("inf")
+    if math.isinf(rounded):
+        return float("inf")
+    error = abs(_reference.D(computed) - exact) / _reference.D(_ulp(rounded))
+    return float(error)
+
+
+def sweep(name, samples=1000, seed=0):
+    """
+    Return test inputs for ``name``.
+
+    Parameters
+    ----------
+    name : str
+        One of ``FUNCTIONS``.
+    samples : int, optional
+        Random inputs per region. Boundary points are added on top.
+    seed : int, optional
+
+    Returns
+    -------
+    list of (str, float)
+        The region of each input and the input itself, restricted to the
+        domain of the scalar function.
+    """
+    rng = random.Random(seed)
+    check = getattr(pyerf, name)
+    odd = name in _ODD
+
+    points = []
+    for region, sampler in _REGIONS[name]:
+        for _ in range(samples):
+            x = sampler(rng.random())
+            if odd and rng.random() < 0.5:
+                x = -x
+            points.append((region, x))
+
+    for boundary in _BOUNDARIES[name]:
+        sign = -1 if boundary < 0 else 1
+        for steps in (-2, -1, 0, 1, 2):
+            x = sign * _next_after(abs(boundary), steps)
+            points.append(("boundary", x))
+            if odd:
+                points.append(("boundary", -x))
+
+    inputs = []
+    for region, x in points:
+        try:
+            check(x)
+        except ValueError:
+            continue
+        inputs.append((region, x))
+    return inputs
+
+
+def backends(name):
+    """
+    Return the batch functions that can compute ``name``, keyed by backend.
+    """
+    if name == "ndtri":
+        _ndtri = pyerf.ndtri
+        return {"scalar": lambda values: [_ndtri(p) for p in values]}
+
+    found = dict(batch._KERNELS[name])
+    cephes = getattr(pyerf, "_" + name, None)
+    if cephes is not None and cephes is not getattr(pyerf, name):
+        found["cephes"] = lambda values: [cephes(x) for x in values]
+    return found
+
+
+def _evaluate(func, values):
+    """
+    Apply ``func`` to ``values``. If the batch fails, fall back to one
+    item at a time and return None for each item that fails.
+    """
+    try:
+        return func(values)
+    except (ValueError, OverflowError, ZeroDivisionError):
+        pass
+    results = []
+    for x in values:
+        try:
+            results.append(func([x])[0])
+        except (ValueError, OverflowError, ZeroDivisionError):
+            results.append(None)
+    return results
+
+
+def _throughput(func, values, repeat):
+    """
+    Return the best of ``repeat`` timings of ``func(values)``, as values
+    per second.
+    """
+    if not values:
+        return 0.0
+    best = min(timeit.repeat(lambda: func(values), number=1, repeat=repeat))
+    return len(values) / best if best > 0 else float("inf")
+
+
+def _mark_pareto(rows):
+    """
+    Set ``row["pareto"]`` for each row of a single function.
+    """
+    for row in rows:
+        row["pareto"] = not any(
+            other is not row
+            and other["max_ulp"] <= row["max_ulp"]
+            and other["values_per_second"] >= row["values_per_second"]
+            and (
+                other["max_ulp"] < row["max_ulp"]
+                or other["values_per_second"] > row["values_per_second"]
+            )
+            for other in rows
+        )
+
+
+def report(functions=None, samples=1000, seed=0, repeat=3):
+    """
+    Measure the accuracy and speed of every backend.
+
+    Parameters
+    ----------
+    functions : iterable of str, optional
+        Defaults to ``FUNCTIONS``.
+    samples : int, optional
+        Random inputs per region; see :func:`sweep`.
+    seed : int, optional
+    repeat : int, optional
+        How many times to time each backend. The best time is used.
+
+    Returns
+    -------
+    list of dict
+        One row per function and backend, with keys ``function``,
+        ``backend``, ``inputs``, ``failures`` (inputs the backend raised
+        on), ``max_ulp``, ``mean_ulp``, ``worst_input``, ``worst_region``,
+        ``values_per_second`` and ``pareto``.
+    """
+    if functions is None:
+        functions = FUNCTIONS
+
+    rows = []
+    for name in functions:
+        inputs = sweep(name, samples, seed)
+        values = [x for _, x in inputs]
+        reference = _REFERENCES[name]
+        exact = [reference(x) for x in values]
+
+        function_rows = []
+        for backend, func in sorted(backends(name).items()):
+            results = _evaluate(func, values)
+            errors = []
+            worst = (-1.0, None, None)
+            accepted = []
+            for (region, x), computed, expected in zip(inputs, results, exact):
+                if computed is None:
+                    continue
+                accepted.append(x)
+                error = ulp_error(computed, expected)
+                errors.append(error)
+                if error > worst[0]:
+                    worst = (error, x, region)
+
+            function_rows.append(
+                {
+                    "function": name,
+                    "backend": backend,
+                    "inputs": len(values),
+                    "failures": len(values) - len(accepted),
+                    "max_ulp": max(errors) if errors else float("nan"),
+                    "mean_ulp": sum(errors) / len(errors) if errors else float("nan"),
+                    "worst_input": worst[1],
+                    "worst_region": worst[2],
+                    "values_per_second": _throughput(func, accepted, repeat),
+                }
+            )
+        _mark_pareto(function_rows)
+        rows.extend(function_rows)
+    return rows
+
+
+COLUMNS = (
+    "function",
+    "backend",
+    "inputs",
+    "failures",
+    "max_ulp",
+    "mean_ulp",
+    "worst_input",
+    "worst_region",
+    "values_per_second",
+    "pareto",
+)
+
+
+def write_json(rows, f):
+    """
+    Write the rows from :func:`report` to the text file ``f`` as JSON.
+    """
+    json.dump(rows, f, indent=2, sort_keys=True)
+    f.write("\n")
+
+
+def write_csv(rows, f):
+    """
+    Write the rows from :func:`report` to the text file ``f`` as CSV.
+    """
+    writer = csv.DictWriter(f, COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "functions",
+        nargs="*",
+        metavar="FUNCTION",
+        help="functions to measure (default: all of {})".format(", ".join(FUNCTIONS)),
+    )
+    parser.add_argument("--samples", type=int, default=1000, help="inputs per region")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timing repeats")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--output", metavar="PATH", help="default: stdout")
+    args = parser.parse_args(argv)
+    for name in args.functions:
+        if name not in FUNCTIONS:
+            parser.error("unknown function: {}".format(name))
+
+    rows = report(args.functions or None, args.samples, args.seed, args.repeat)
+    write = write_json if args.format == "json" else write_csv
+    if args.output:
+        with open(args.output, "w") as f:
+            write(rows, f)
+    else:
+        write(rows, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,11 @@ This is the main module for PyErf.
 
 import math
 
+try:
+    from . import _kernels
+except ImportError:
+    # Imported as a top-level module, as by ``python -m doctest pyerf/pyerf.py``.
+    import _kernels
 
 # While some of these are used only in _ndtri, we don't want to
 # calculate them each time a user calls erfinv. So we define them at the
@@ -23,6 +28,145 @@ except ImportError:
 # Inputs above this value are considered infinity.
 MAXVAL = 1e50
 
+# erf_diff subtracts erfc values when both arguments are at least this far
+# out in the same tail, and erf values otherwise.
+ERF_DIFF_SWITCH = 0.5
+
+
+# Coefficients for the cephes rational approximations. Like the constants
+# above, these live at the module level so that the batch kernels can share
+# them with the scalar functions below.
+
+# approximation for abs(x) <= 1
+ERF_T = [
+    9.60497373987051638749e0,
+    9.00260197203842689217e1,
+    2.23200534594684319226e3,
+    7.00332514112805075473e3,
+    5.55923013010394962768e4,
+]
+
+ERF_U = [
+    3.35617141647503099647e1,
+    5.21357949780152679795e2,
+    4.59432382970980127987e3,
+    2.26290000613890934246e4,
+    4.92673942608635921086e4,
+]
+
+# approximation for abs(a) < 8 and abs(a) >= 1
+ERFC_P = [
+    2.46196981473530512524e-10,
+    5.64189564831068821977e-1,
+    7.46321056442269912687e0,
+    4.86371970985681366614e1,
+    1.96520832956077098242e2,
+    5.26445194995477358631e2,
+    9.34528527171957607540e2,
+    1.02755188689515710272e3,
+    5.57535335369399327526e2,
+]
+
+ERFC_Q = [
+    1.32281951154744992508e1,
+    8.67072140885989742329e1,
+    3.54937778887819891062e2,
+    9.75708501743205489753e2,
+    1.82390916687909736289e3,
+    2.24633760818710981792e3,
+    1.65666309194161350182e3,
+    5.57535340817727675546e2,
+]
+
+# approximation for abs(a) >= 8
+ERFC_R = [
+    5.64189583547755073984e-1,
+    1.27536670759978104416e0,
+    5.01905042251180477414e0,
+    6.16021097993053585195e0,
+    7.40974269950448939160e0,
+    2.97886665372100240670e0,
+]
+
+ERFC_S = [
+    2.26052863220117276590e0,
+    9.39603524938001434673e0,
+    1.20489539808096656605e1,
+    1.70814450747565897222e1,
+    9.60896809063285878198e0,
+    3.36907645100081516050e0,
+]
+
+# approximation for 0 <= abs(z - 0.5) <= 3/8
+NDTRI_P0 = [
+    -5.99633501014107895267e1,
+    9.80010754185999661536e1,
+    -5.66762857469070293439e1,
+    1.39312609387279679503e1,
+    -1.23916583867381258016e0,
+]
+
+NDTRI_Q0 = [
+    1.95448858338141759834e0,
+    4.67627912898881538453e0,
+    8.63602421390890590575e1,
+    -2.25462687854119370527e2,
+    2.00260212380060660359e2,
+    -8.20372256168333339912e1,
+    1.59056225126211695515e1,
+    -1.18331621121330003142e0,
+]
+
+# Approximation for interval z = sqrt(-2 log y ) between 2 and 8
+# i.e., y between exp(-2) = .135 and exp(-32) = 1.27e-14.
+NDTRI_P1 = [
+    4.05544892305962419923e0,
+    3.15251094599893866154e1,
+    5.71628192246421288162e1,
+    4.40805073893200834700e1,
+    1.46849561928858024014e1,
+    2.18663306850790267539e0,
+    -1.40256079171354495875e-1,
+    -3.50424626827848203418e-2,
+    -8.57456785154685413611e-4,
+]
+
+NDTRI_Q1 = [
+    1.57799883256466749731e1,
+    4.53907635128879210584e1,
+    4.13172038254672030440e1,
+    1.50425385692907503408e1,
+    2.50464946208309415979e0,
+    -1.42182922854787788574e-1,
+    -3.80806407691578277194e-2,
+    -9.33259480895457427372e-4,
+]
+
+# Approximation for interval z = sqrt(-2 log y ) between 8 and 64
+# i.e., y between exp(-32) = 1.27e-14 and exp(-2048) = 3.67e-890.
+NDTRI_P2 = [
+    3.23774891776946035970e0,
+    6.91522889068984211695e0,
+    3.93881025292474443415e0,
+    1.33303460815807542389e0,
+    2.01485389549179081538e-1,
+    1.23716634817820021358e-2,
+    3.01581553508235416007e-4,
+    2.65806974686737550832e-6,
+    6.23974539184983293730e-9,
+]
+
+NDTRI_Q2 = [
+    6.02427039364742014255e0,
+    3.67983563856160859403e0,
+    1.37702099489081330271e0,
+    2.16236993594496635890e-1,
+    1.34204006088543189037e-2,
+    3.28014464682127739104e-4,
+    2.89247864745380683936e-6,
+    6.79019408009981274425e-9,
+]
+
 
 def _erf(x):
     """
@@ -30,22 +174,6 @@ def _erf(x):
 
     See https://github.com/jeremybarnes/cephes/blob/master/cprob/ndtr.c
     """
-    T = [
-        9.60497373987051638749e0,
-        9.00260197203842689217e1,
-        2.23200534594684319226e3,
-        7.00332514112805075473e3,
-        5.55923013010394962768e4,
-    ]
-
-    U = [
-        3.35617141647503099647e1,
-        5.21357949780152679795e2,
-        4.59432382970980127987e3,
-        2.26290000613890934246e4,
-        4.92673942608635921086e4,
-    ]
-
     # Shorcut special cases
     if x == 0:
         return 0
@@ -58,7 +186,7 @@ def _erf(x):
         return 1 - erfc(x)
 
     z = x * x
-    return x * _polevl(z, T, 4) / _p1evl(z, U, 5)
+    return x * _kernels.erf_t(z) / _kernels.erf_u(z)
 
 
 def _erfc(a):
@@ -67,49 +195,6 @@ def _erfc(a):
 
     See https://github.com/jeremybarnes/cephes/blob/master/cprob/ndtr.c
     """
-    # approximation for abs(a) < 8 and abs(a) >= 1
-    P = [
-        2.46196981473530512524e-10,
-        5.64189564831068821977e-1,
-        7.46321056442269912687e0,
-        4.86371970985681366614e1,
-        1.96520832956077098242e2,
-        5.26445194995477358631e2,
-        9.34528527171957607540e2,
-        1.02755188689515710272e3,
-        5.57535335369399327526e2,
-    ]
-
-    Q = [
-        1.32281951154744992508e1,
-        8.67072140885989742329e1,
-        3.54937778887819891062e2,
-        9.75708501743205489753e2,
-        1.82390916687909736289e3,
-        2.24633760818710981792e3,
-        1.65666309194161350182e3,
-        5.57535340817727675546e2,
-    ]
-
-    # approximation for abs(a) >= 8
-    R = [
-        5.64189583547755073984e-1,
-        1.27536670759978104416e0,
-        5.01905042251180477414e0,
-        6.16021097993053585195e0,
-        7.40974269950448939160e0,
-        2.97886665372100240670e0,
-    ]
-
-    S = [
-        2.26052863220117276590e0,
-        9.39603524938001434673e0,
-        1.20489539808096656605e1,
-        1.70814450747565897222e1,
-        9.60896809063285878198e0,
-        3.36907645100081516050e0,
-    ]
-
     # Shortcut special cases
     if a == 0:
         return 1
@@ -131,11 +216,11 @@ def _erfc(a):
     z = math.exp(z)
 
     if x < 8:
-        p = _polevl(x, P, 8)
-        q = _p1evl(x, Q, 8)
+        p = _kernels.erfc_p(x)
+        q = _kernels.erfc_q(x)
     else:
-        p = _polevl(x, R, 5)
-        q = _p1evl(x, S, 6)
+        p = _kernels.erfc_r(x)
+        q = _kernels.erfc_s(x)
 
     y = (z * p) / q
 
@@ -149,6 +234,9 @@ def _polevl(x, coefs, N):
     """
     Port of cephes ``polevl.c``: evaluate polynomial
 
+    The functions in this module use the unrolled versions generated into
+    ``pyerf._kernels`` instead; see ``pyerf._codegen``.
+
     See https://github.com/jeremybarnes/cephes/blob/master/cprob/polevl.c
     """
     ans = 0
@@ -177,76 +265,6 @@ def _ndtri(y):
 
     See https://github.com/jeremybarnes/cephes/blob/master/cprob/ndtri.c
     """
-    # approximation for 0 <= abs(z - 0.5) <= 3/8
-    P0 = [
-        -5.99633501014107895267e1,
-        9.80010754185999661536e1,
-        -5.66762857469070293439e1,
-        1.39312609387279679503e1,
-        -1.23916583867381258016e0,
-    ]
-
-    Q0 = [
-        1.95448858338141759834e0,
-        4.67627912898881538453e0,
-        8.63602421390890590575e1,
-        -2.25462687854119370527e2,
-        2.00260212380060660359e2,
-        -8.20372256168333339912e1,
-        1.59056225126211695515e1,
-        -1.18331621121330003142e0,
-    ]
-
-    # Approximation for interval z = sqrt(-2 log y ) between 2 and 8
-    # i.e., y between exp(-2) = .135 and exp(-32) = 1.27e-14.
-    P1 = [
-        4.05544892305962419923e0,
-        3.15251094599893866154e1,
-        5.71628192246421288162e1,
-        4.40805073893200834700e1,
-        1.46849561928858024014e1,
-        2.18663306850790267539e0,
-        -1.40256079171354495875e-1,
-        -3.50424626827848203418e-2,
-        -8.57456785154685413611e-4,
-    ]
-
-    Q1 = [
-        1.57799883256466749731e1,
-        4.53907635128879210584e1,
-        4.13172038254672030440e1,
-        1.50425385692907503408e1,
-        2.50464946208309415979e0,
-        -1.42182922854787788574e-1,
-        -3.80806407691578277194e-2,
-        -9.33259480895457427372e-4,
-    ]
-
-    # Approximation for interval z = sqrt(-2 log y ) between 8 and 64
-    # i.e., y between exp(-32) = 1.27e-14 and exp(-2048) = 3.67e-890.
-    P2 = [
-        3.23774891776946035970e0,
-        6.91522889068984211695e0,
-        3.93881025292474443415e0,
-        1.33303460815807542389e0,
-        2.01485389549179081538e-1,
-        1.23716634817820021358e-2,
-        3.01581553508235416007e-4,
-        2.65806974686737550832e-6,
-        6.23974539184983293730e-9,
-    ]
-
-    Q2 = [
-        6.02427039364742014255e0,
-        3.67983563856160859403e0,
-        1.37702099489081330271e0,
-        2.16236993594496635890e-1,
-        1.34204006088543189037e-2,
-        3.28014464682127739104e-4,
-        2.89247864745380683936e-6,
-        6.79019408009981274425e-9,
-    ]
-
     sign_flag = 1
 
     if y > (1 - EXP_NEG2):
@@ -258,7 +276,7 @@ def _ndtri(y):
     if y > EXP_NEG2:
         y -= 0.5
         y2 = y**2
-        x = y + y * (y2 * _polevl(y2, P0, 4) / _p1evl(y2, Q0, 8))
+        x = y + y * (y2 * _kernels.ndtri_p0(y2) / _kernels.ndtri_q0(y2))
         x = x * ROOT_2PI
         return x
 
@@ -267,9 +285,9 @@ def _ndtri(y):
 
     z = 1.0 / x
     if x < 8.0:  # y > exp(-32) = 1.2664165549e-14
-        x1 = z * _polevl(z, P1, 8) / _p1evl(z, Q1, 8)
+        x1 = z * _kernels.ndtri_p1(z) / _kernels.ndtri_q1(z)
     else:
-        x1 = z * _polevl(z, P2, 8) / _p1evl(z, Q2, 8)
+        x1 = z * _kernels.ndtri_p2(z) / _kernels.ndtri_q2(z)
 
     x = x0 - x1
     if sign_flag != 0:
@@ -278,6 +296,50 @@ def _ndtri(y):
     return x
 
 
+def ndtri(p):
+    """
+    Calculate the inverse of the standard normal CDF at point ``p``.
+
+    This is ``sqrt(2) * erfinv(2 * p - 1)`` but without forming ``2 * p - 1``,
+    so small ``p`` keeps its precision.
+
+    Parameters
+    ----------
+    p : numeric
+
+    Returns
+    -------
+    float
+
+    References
+    ----------
+    + https://en.wikipedia.org/wiki/Normal_distribution#Quantile_function
+
+    Examples
+    --------
+    >>> round(ndtri(0.975), 12)
+    1.95996398454
+    >>> round(ndtri(1e-300), 10)
+    -37.0470962994
+    >>> ndtri(0.5)
+    0.0
+    >>> ndtri(0)
+    -inf
+    >>> ndtri(1)
+    inf
+    """
+    if p < 0 or p > 1:
+        raise ValueError("`p` must be between 0 and 1 inclusive")
+
+    # Shortcut special cases
+    if p == 0:
+        return -inf
+    if p == 1:
+        return inf
+
+    return _ndtri(p)
+
+
 def erfinv(z):
     """
     Calculate the inverse error function at point ``z``.
@@ -334,6 +396,100 @@ def erfinv(z):
     return _ndtri((z + 1) / 2.0) / math.sqrt(2)
 
 
+def erfcinv(z):
+    """
+    Calculate the inverse complementary error function at point ``z``.
+
+    Unlike ``erfinv(1 - z)``, this never forms ``1 - z`` so it stays
+    accurate for very small ``z``: ``_ndtri`` is called on ``z / 2``
+    directly and the tail approximations do all the work.
+
+    Parameters
+    ----------
+    z : numeric
+
+    Returns
+    -------
+    float
+
+    References
+    ----------
+    + https://en.wikipedia.org/wiki/Error_function#Inverse_functions
+    + http://functions.wolfram.com/GammaBetaErf/InverseErfc/
+
+    Examples
+    --------
+    >>> round(erfcinv(0.5), 12)
+    0.476936276204
+    >>> round(erfcinv(1.5), 12)
+    -0.476936276204
+    >>> round(erfcinv(1e-300), 10)
+    26.2094699605
+    >>> round(erfc(erfcinv(0.3)), 3)
+    0.3
+    >>> erfcinv(1)
+    0
+    >>> erfcinv(0)
+    inf
+    >>> erfcinv(2)
+    -inf
+    """
+    if z < 0 or z > 2:
+        raise ValueError("`z` must be between 0 and 2 inclusive")
+
+    # Shortcut special cases
+    if z == 1:
+        return 0
+    if z == 0:
+        return inf
+    if z == 2:
+        return -inf
+
+    y = z / 2.0
+    # The smallest subnormal underflows when halved. Like SciPy, treat
+    # that as the edge of ndtri's range.
+    if y == 0:
+        return inf
+
+    return -_ndtri(y) / math.sqrt(2)
+
+
+def erf_diff(a, b):
+    """
+    Calculate ``erf(b) - erf(a)`` without catastrophic cancellation.
+
+    When ``a`` and ``b`` are both deep in the same tail, ``erf(a)`` and
+    ``erf(b)`` are both close to +-1 and subtracting them loses every
+    digit. In that case the difference of the complementary error
+    functions is used instead, which is the same value but computed from
+    numbers close to zero.
+
+    Parameters
+    ----------
+    a, b : numeric
+
+    Returns
+    -------
+    float
+
+    Examples
+    --------
+    >>> round(erf_diff(-1, 1), 12)
+    1.685401585899
+    >>> erf(7) - erf(6)
+    0.0
+    >>> "{:.6e}".format(erf_diff(6, 7))
+    '2.151969e-17'
+    >>> "{:.6e}".format(erf_diff(-7, -6))
+    '2.151969e-17'
+    """
+    if a >= ERF_DIFF_SWITCH and b >= ERF_DIFF_SWITCH:
+        return erfc(a) - erfc(b)
+    if a <= -ERF_DIFF_SWITCH and b <= -ERF_DIFF_SWITCH:
+        return erfc(-b) - erfc(-a)
+    return erf(b) - erf(a)
+
+
 # bring the built-ins into this namespace for conveinence.
 try:
     # math.erf and math.erfc were added in Python 3.2
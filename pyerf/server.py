@@ -0,0 +1,491 @@
+# -*- coding: utf-8 -*-
+"""
+A local evaluation server for PyErf.
+
+Many small processes can share one warmed-up interpreter by sending their
+batches to a :class:`Server` over a Unix socket or a localhost TCP port.
+Requests that arrive close together are coalesced into one larger batch
+per function before being handed to ``pyerf.batch``.
+
+Protocol
+--------
+Every message is a header followed by a payload. All numbers are
+little-endian.
+
+Request header: ``opcode`` (uint8), ``count`` (uint32), followed by
+``count`` float64 values. See ``OPCODES``; ``METRICS`` takes no values.
+
+Response header: ``status`` (uint8), ``count`` (uint32). For ``OK`` the
+payload is ``count`` float64 values. For ``ERROR`` and ``JSON`` it is
+``count`` bytes of UTF-8 text.
+
+A connection may carry any number of request/response pairs.
+
+Usage
+-----
+Start a server from the command line::
+
+    python -m pyerf.server --unix /tmp/pyerf.sock
+
+and talk to it with :class:`Client`:
+
+>>> with Client("/tmp/pyerf.sock") as client:      # doctest: +SKIP
+...     client.erfinv([0.1, 0.5])
+[0.08885599049425769, 0.4769362762044699]
+"""
+
+import argparse
+import array
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+
+from . import batch
+
+__all__ = [
+    "Client",
+    "Server",
+]
+
+# Request opcodes
+METRICS = 0
+OPCODES = {
+    1: "erf",
+    2: "erfc",
+    3: "erfinv",
+    4: "erfcinv",
+}
+_NAMES = {name: opcode for opcode, name in OPCODES.items()}
+
+# Response statuses
+OK = 0
+ERROR = 1
+JSON = 2
+
+HEADER = struct.Struct("<BI")
+
+# Refuse requests larger than this many values (128 MiB of float64).
+MAX_VALUES = 1 << 24
+
+
+def _recv_exact(sock, size):
+    """
+    Read exactly ``size`` bytes from ``sock``. Returns None on a clean EOF
+    before the first byte.
+    """
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise EOFError("Connection closed mid-message")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _pack_doubles(values):
+    doubles = array.array("d", values)
+    if sys.byteorder != "little":
+        doubles.byteswap()
+    return doubles.tobytes()
+
+
+def _unpack_doubles(data):
+    doubles = array.array("d")
+    doubles.frombytes(data)
+    if sys.byteorder != "little":
+        doubles.byteswap()
+    return doubles
+
+
+def _send(sock, code, payload, count):
+    sock.sendall(HEADER.pack(code, count) + payload)
+
+
+def _send_text(sock, status, text):
+    data = text.encode("utf-8")
+    _send(sock, status, data, len(data))
+
+
+class _Request(object):
+    """
+    One client request waiting for the coalescing worker.
+    """
+
+    __slots__ = ("name", "values", "done", "result", "error")
+
+    def __init__(self, name, values):
+        self.name = name
+        self.values = values
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Coalescer(object):
+    """
+    Collects requests from many connection threads and evaluates them in
+    batches on a single worker thread.
+    """
+
+    def __init__(self, max_batch, max_wait):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {
+            "requests": 0,
+            "values": 0,
+            "batches": 0,
+            "errors": 0,
+            "max_queue_depth": 0,
+        }
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="pyerf-coalescer")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def submit(self, name, values):
+        """
+        Queue a request and block until it has been evaluated.
+        """
+        request = _Request(name, values)
+        with self.lock:
+            # Checked under the lock so nothing is queued after stop()'s
+            # sentinel, where the worker would never see it.
+            if not self.running:
+                raise RuntimeError("Server is shutting down")
+            self.queue.put(request)
+            depth = self.queue.qsize()
+            if depth > self.counters["max_queue_depth"]:
+                self.counters["max_queue_depth"] = depth
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def stop(self):
+        with self.lock:
+            self.running = False
+            self.queue.put(None)
+        self.thread.join()
+
+        # The worker may have stopped at the sentinel with requests still
+        # behind it.
+        while True:
+            try:
+                request = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request.error = RuntimeError("Server is shutting down")
+                request.done.set()
+
+    def _collect(self):
+        """
+        Wait for a request, then gather whatever else arrives within
+        ``max_wait`` seconds, up to ``max_batch`` values.
+        """
+        first = self.queue.get()
+        if first is None:
+            return []
+        pending = [first]
+        size = len(first.values)
+        deadline = time.time() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.time()
+            try:
+                if timeout > 0:
+                    request = self.queue.get(timeout=timeout)
+                else:
+                    request = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self.running = False
+                break
+            pending.append(request)
+            size += len(request.values)
+        return pending
+
+    def _evaluate(self, name, requests):
+        func = getattr(batch, name)
+        combined = array.array("d")
+        for request in requests:
+            combined.extend(request.values)
+
+        try:
+            results = func(combined)
+        except Exception:
+            # Somebody sent a bad value. Fall back to one batch per request
+            # so that only the offending requests see the error.
+            for request in requests:
+                try:
+                    request.result = func(request.values)
+                except Exception as err:
+                    request.error = err
+            return len(requests)
+
+        start = 0
+        for request in requests:
+            end = start + len(request.values)
+            request.result = results[start:end]
+            start = end
+        return 1
+
+    def _run(self):
+        while self.running:
+            pending = self._collect()
+            groups = {}
+            for request in pending:
+                groups.setdefault(request.name, []).append(request)
+
+            batches = 0
+            for name, requests in groups.items():
+                batches += self._evaluate(name, requests)
+
+            with self.lock:
+                counters = self.counters
+                counters["requests"] += len(pending)
+                counters["values"] += sum(len(r.values) for r in pending)
+                counters["batches"] += batches
+                counters["errors"] += sum(r.error is not None for r in pending)
+
+            for request in pending:
+                request.done.set()
+
+    def metrics(self):
+        with self.lock:
+            metrics = dict(self.counters)
+        uptime = time.time() - self.started
+        metrics["queue_depth"] = self.queue.qsize()
+        metrics["uptime"] = uptime
+        metrics["values_per_second"] = metrics["values"] / uptime if uptime else 0.0
+        if metrics["batches"]:
+            metrics["mean_batch_values"] = metrics["values"] / metrics["batches"]
+        else:
+            metrics["mean_batch_values"] = 0.0
+        return metrics
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sock = self.request
+        coalescer = self.server.coalescer
+        while True:
+            header = _recv_exact(sock, HEADER.size)
+            if header is None:
+                return
+            opcode, count = HEADER.unpack(header)
+
+            if count > MAX_VALUES:
+                _send_text(sock, ERROR, "Too many values: {}".format(count))
+                return
+            data = _recv_exact(sock, 8 * count) if count else b""
+            if data is None:
+                # Closed after a header that promised values.
+                return
+            values = _unpack_doubles(data)
+
+            if opcode == METRICS:
+                _send_text(sock, JSON, json.dumps(coalescer.metrics()))
+                continue
+            if opcode not in OPCODES:
+                _send_text(sock, ERROR, "Unknown opcode: {}".format(opcode))
+                continue
+
+            try:
+                result = coalescer.submit(OPCODES[opcode], values)
+            except Exception as err:
+                _send_text(sock, ERROR, str(err))
+                continue
+            _send(sock, OK, _pack_doubles(result), len(result))
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+class Server(object):
+    """
+    Serve PyErf batch evaluations over a local socket.
+
+    Parameters
+    ----------
+    address : str or (str, int)
+        A path for a Unix socket, or a ``(host, port)`` pair for TCP. Use
+        port 0 to pick a free port; see :attr:`address`.
+    max_batch : int, optional
+        Stop coalescing once this many values have been collected.
+    max_wait : float, optional
+        How long, in seconds, to wait for more requests to coalesce with
+        the first one.
+    """
+
+    def __init__(self, address, max_batch=65536, max_wait=0.001):
+        if isinstance(address, tuple):
+            self._server = _TCPServer(address, _Handler)
+        else:
+            self._server = _UnixServer(address, _Handler)
+        self._server.coalescer = _Coalescer(max_batch, max_wait)
+        self._thread = None
+
+    @property
+    def address(self):
+        """
+        The address the server is listening on.
+        """
+        return self._server.server_address
+
+    def serve_forever(self):
+        """
+        Handle requests until :meth:`shutdown` is called.
+        """
+        self._server.serve_forever()
+
+    def start(self):
+        """
+        Handle requests on a background thread.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="pyerf-server")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def shutdown(self):
+        """
+        Stop handling requests and close the socket.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        self._server.coalescer.stop()
+        if not isinstance(self.address, tuple):
+            os.remove(self.address)
+
+    def metrics(self):
+        """
+        Return throughput and queue statistics.
+
+        Returns
+        -------
+        dict
+            ``requests``, ``values`` and ``batches`` handled so far,
+            ``errors``, the current and maximum ``queue_depth``, ``uptime``
+            in seconds, ``values_per_second`` and ``mean_batch_values``.
+        """
+        return self._server.coalescer.metrics()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+class Client(object):
+    """
+    Talk to a :class:`Server`.
+
+    Parameters
+    ----------
+    address : str or (str, int)
+        The server's address, as given to :class:`Server`.
+    timeout : float, optional
+        Socket timeout in seconds.
+    """
+
+    def __init__(self, address, timeout=None):
+        if isinstance(address, tuple):
+            self._sock = socket.create_connection(address, timeout)
+        else:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(address)
+
+    def _call(self, opcode, values):
+        data = _pack_doubles(values)
+        _send(self._sock, opcode, data, len(data) // 8)
+
+        header = _recv_exact(self._sock, HEADER.size)
+        if header is None:
+            raise EOFError("Server closed the connection")
+        status, count = HEADER.unpack(header)
+        if status == OK:
+            return _unpack_doubles(_recv_exact(self._sock, 8 * count) or b"").tolist()
+
+        text = (_recv_exact(self._sock, count) or b"").decode("utf-8")
+        if status == JSON:
+            return json.loads(text)
+        raise ValueError(text)
+
+    def erf(self, values):
+        """Remote :func:`pyerf.batch.erf`."""
+        return self._call(_NAMES["erf"], values)
+
+    def erfc(self, values):
+        """Remote :func:`pyerf.batch.erfc`."""
+        return self._call(_NAMES["erfc"], values)
+
+    def erfinv(self, values):
+        """Remote :func:`pyerf.batch.erfinv`."""
+        return self._call(_NAMES["erfinv"], values)
+
+    def erfcinv(self, values):
+        """Remote :func:`pyerf.batch.erfcinv`."""
+        return self._call(_NAMES["erfcinv"], values)
+
+    def metrics(self):
+        """Remote :meth:`Server.metrics`."""
+        return self._call(METRICS, [])
+
+    def close(self):
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--unix", metavar="PATH", help="listen on a Unix socket")
+    group.add_argument("--port", type=int, help="listen on a localhost TCP port")
+    parser.add_argument("--max-batch", type=int, default=65536)
+    parser.add_argument("--max-wait", type=float, default=0.001)
+    args = parser.parse_args(argv)
+
+    address = args.unix if args.unix else ("127.0.0.1", args.port)
+    server = Server(address, max_batch=args.max_batch, max_wait=args.max_wait)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
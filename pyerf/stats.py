@@ -0,0 +1,610 @@
+# -*- coding: utf-8 -*-
+"""
+Statistics helpers built on ``pyerf.pyerf`` and ``pyerf.batch``.
+"""
+
+import math
+
+from . import _kernels
+from . import batch
+from . import pyerf
+from .pyerf import MAXVAL
+from .pyerf import PI
+
+INV_SQRT_2 = 1 / math.sqrt(2)
+LOG_SQRT_PI = 0.5 * math.log(PI)
+LOG_SQRT_2PI = 0.5 * math.log(2 * PI)
+
+# The offset ``c`` used by each rank_inverse_normal method.
+RANK_OFFSETS = {
+    "blom": 3.0 / 8,
+    "tukey": 1.0 / 3,
+    "rankit": 1.0 / 2,
+    "vdw": 0.0,
+}
+
+
+def _log_erfc(x):
+    """
+    Calculate ``log(erfc(x))`` for ``x >= 0`` without underflowing.
+
+    ``erfc(x)`` underflows to zero at around x = 27. Above 1 the cephes
+    approximation is ``exp(-x**2) * p / q``, so we can take the log of
+    each factor instead.
+    """
+    if x < 1:
+        return math.log(pyerf.erfc(x))
+    if x >= MAXVAL:
+        # erfc(x) ~ exp(-x**2) / (x * sqrt(pi)) and p / q loses precision.
+        return -x * x - math.log(x) - LOG_SQRT_PI
+
+    if x < 8:
+        p = _kernels.erfc_p(x)
+        q = _kernels.erfc_q(x)
+    else:
+        p = _kernels.erfc_r(x)
+        q = _kernels.erfc_s(x)
+
+    return -x * x + math.log(p / q)
+
+
+def two_sided_pvalue(z, log=False):
+    """
+    Calculate the two-sided p-value of the z-score ``z``.
+
+    This is ``erfc(abs(z) / sqrt(2))``.
+
+    Parameters
+    ----------
+    z : numeric
+    log : bool, optional
+        If True, return the natural log of the p-value. This stays finite
+        far beyond the point where the p-value itself underflows to zero.
+
+    Returns
+    -------
+    float
+
+    Examples
+    --------
+    >>> round(two_sided_pvalue(1.959963984540054), 12)
+    0.05
+    >>> two_sided_pvalue(40)
+    0.0
+    >>> round(two_sided_pvalue(40, log=True), 6)
+    -803.915295
+    """
+    x = abs(z) * INV_SQRT_2
+    if log:
+        return _log_erfc(x)
+    return pyerf.erfc(x)
+
+
+def two_sided_pvalues(z_scores, log=False):
+    """
+    Calculate the two-sided p-value for each z-score in ``z_scores``.
+
+    Parameters
+    ----------
+    z_scores : iterable of numeric
+        Any iterable works, including ``array.array`` and ``memoryview``
+        buffers.
+    log : bool, optional
+        If True, return the natural log of the p-values.
+
+    Returns
+    -------
+    list of float
+
+    Examples
+    --------
+    >>> [round(p, 6) for p in two_sided_pvalues([0, 1, -2])]
+    [1.0, 0.317311, 0.0455]
+    """
+    if log:
+        log_erfc = _log_erfc
+        return [log_erfc(abs(z) * INV_SQRT_2) for z in z_scores]
+    return batch.erfc(abs(z) * INV_SQRT_2 for z in z_scores)
+
+
+def iter_two_sided_pvalues(chunks, log=False):
+    """
+    Lazily calculate two-sided p-values for a stream of z-score chunks.
+
+    Only one chunk is held in memory at a time, so this works for inputs
+    that do not fit in RAM.
+
+    Parameters
+    ----------
+    chunks : iterable of iterables of numeric
+        For example, successive reads of a binary file into
+        ``array.array("d")`` buffers.
+    log : bool, optional
+        If True, yield the natural log of the p-values.
+
+    Yields
+    ------
+    list of float
+        The p-values for each chunk.
+
+    Examples
+    --------
+    >>> chunks = iter_two_sided_pvalues([[0], [1, -2]])
+    >>> [[round(p, 6) for p in chunk] for chunk in chunks]
+    [[1.0], [0.317311, 0.0455]]
+    """
+    for chunk in chunks:
+        yield two_sided_pvalues(chunk, log=log)
+
+
+def bonferroni(pvalues, log=False, n_tests=None):
+    """
+    Apply the Bonferroni correction to ``pvalues``.
+
+    Parameters
+    ----------
+    pvalues : iterable of float
+    log : bool, optional
+        If True, ``pvalues`` are natural logs and so is the result.
+    n_tests : int, optional
+        The total number of tests. Defaults to ``len(pvalues)``. Pass this
+        when correcting one chunk of a larger stream at a time.
+
+    Returns
+    -------
+    list of float
+
+    Examples
+    --------
+    >>> bonferroni([0.01, 0.02, 0.5])
+    [0.03, 0.06, 1.0]
+    """
+    pvalues = list(pvalues)
+    if n_tests is None:
+        n_tests = len(pvalues)
+
+    if log:
+        log_n = math.log(n_tests) if n_tests else 0.0
+        return [min(0.0, p + log_n) for p in pvalues]
+    return [min(1.0, p * n_tests) for p in pvalues]
+
+
+def benjamini_hochberg(pvalues, log=False):
+    """
+    Apply the Benjamini-Hochberg false discovery rate correction.
+
+    The p-values are sorted once; the adjusted values are then a running
+    minimum from the largest p-value down.
+
+    Unlike :func:`bonferroni`, every adjusted value depends on every
+    p-value, so ``pvalues`` has to be materialized. Passing an
+    ``array.array("d")`` keeps that at 8 bytes per value.
+
+    Parameters
+    ----------
+    pvalues : iterable of float
+    log : bool, optional
+        If True, ``pvalues`` are natural logs and so is the result.
+
+    Returns
+    -------
+    list of float
+        The adjusted p-values, in the same order as ``pvalues``.
+
+    Examples
+    --------
+    >>> [round(p, 6) for p in benjamini_hochberg([0.01, 0.04, 0.03, 0.5])]
+    [0.04, 0.053333, 0.053333, 0.5]
+    """
+    if not hasattr(pvalues, "__getitem__"):
+        pvalues = list(pvalues)
+    n = len(pvalues)
+    order = sorted(range(n), key=pvalues.__getitem__, reverse=True)
+
+    adjusted = [0.0] * n
+    if log:
+        log_n = math.log(n) if n else 0.0
+        running = 0.0
+        for rank, i in zip(range(n, 0, -1), order):
+            running = min(running, pvalues[i] + log_n - math.log(rank))
+            adjusted[i] = running
+    else:
+        running = 1.0
+        for rank, i in zip(range(n, 0, -1), order):
+            running = min(running, pvalues[i] * (n / rank))
+            adjusted[i] = running
+    return adjusted
+
+
+def rank_inverse_normal(data, method="blom"):
+    """
+    Apply a rank-based inverse normal transform to ``data``.
+
+    Each value is replaced by ``ndtri((r - c) / (n - 2c + 1))`` where ``r``
+    is its rank (ties get the average rank), ``n`` is the number of values
+    and ``c`` depends on ``method``.
+
+    The scores for ranks ``r`` and ``n + 1 - r`` are negatives of each
+    other and tied values share a rank, so ``_ndtri`` is evaluated at most
+    once per distinct rank below the median. For untied data that is half
+    as many calls as values.
+
+    Parameters
+    ----------
+    data : iterable of numeric
+        The values to transform. They must be totally ordered, so no NaNs.
+    method : str, optional
+        One of the keys of ``RANK_OFFSETS``: ``"blom"`` (c = 3/8, the
+        default), ``"tukey"`` (c = 1/3), ``"rankit"`` (c = 1/2) or
+        ``"vdw"`` (Van der Waerden, c = 0).
+
+    Returns
+    -------
+    list of float
+        The normal scores, in the same order as ``data``.
+
+    Raises
+    ------
+    ValueError
+        If ``method`` is unknown.
+
+    Examples
+    --------
+    >>> [round(x, 6) for x in rank_inverse_normal([10, 30, 20])]
+    [-0.869424, 0.869424, 0.0]
+    >>> [round(x, 6) for x in rank_inverse_normal([1, 1, 5, 7], "rankit")]
+    [-0.67449, -0.67449, 0.318639, 1.150349]
+    """
+    try:
+        c = RANK_OFFSETS[method]
+    except KeyError:
+        msg = "Unknown method {!r}. Expected one of: {}"
+        raise ValueError(msg.format(method, ", ".join(sorted(RANK_OFFSETS))))
+
+    if not hasattr(data, "__getitem__"):
+        data = list(data)
+    n = len(data)
+    order = sorted(range(n), key=data.__getitem__)
+    denom = n - 2 * c + 1
+    ndtri = pyerf._ndtri
+
+    scores = [0.0] * n
+    # Keyed by twice the rank so that average ranks stay integers.
+    computed = {}
+    start = 0
+    while start < n:
+        value = data[order[start]]
+        end = start + 1
+        while end < n and data[order[end]] == value:
+            end += 1
+
+        # Ranks start + 1 through end are tied.
+        twice_rank = start + end + 1
+        mirror = 2 * (n + 1) - twice_rank
+        if twice_rank == mirror:
+            score = 0.0
+        elif mirror in computed:
+            score = -computed[mirror]
+        else:
+            score = ndtri((twice_rank / 2.0 - c) / denom)
+            computed[twice_rank] = score
+
+        for i in order[start:end]:
+            scores[i] = score
+        start = end
+
+    return scores
+
+
+def _check_sigma(sigma):
+    if not sigma > 0:
+        raise ValueError("`sigma` must be positive, not {!r}".format(sigma))
+
+
+class _Frozen(object):
+    """
+    Base class for immutable objects with ``__slots__``.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} objects are immutable".format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{} objects are immutable".format(type(self).__name__))
+
+    def _set(self, **attributes):
+        for name, value in attributes.items():
+            object.__setattr__(self, name, value)
+
+
+class Normal(_Frozen):
+    """
+    A frozen normal distribution with mean ``mu`` and standard deviation
+    ``sigma``.
+
+    The constants that every evaluation needs are computed once, when the
+    distribution is created. Each method has a ``_batch`` counterpart that
+    takes an iterable and returns a list.
+
+    Parameters
+    ----------
+    mu : numeric, optional
+    sigma : numeric, optional
+        Must be positive.
+
+    Raises
+    ------
+    ValueError
+        If ``sigma`` isn't positive.
+
+    Examples
+    --------
+    >>> dist = Normal(100, 15)
+    >>> round(dist.cdf(130), 6)
+    0.97725
+    >>> round(dist.ppf(0.975), 6)
+    129.39946
+    >>> [round(x, 6) for x in dist.sf_batch([100, 115])]
+    [0.5, 0.158655]
+    """
+
+    __slots__ = ("mu", "sigma", "_inv_scale", "_log_norm")
+
+    def __init__(self, mu=0.0, sigma=1.0):
+        _check_sigma(sigma)
+        self._set(
+            mu=float(mu),
+            sigma=float(sigma),
+            _inv_scale=INV_SQRT_2 / sigma,
+            _log_norm=-math.log(sigma) - LOG_SQRT_2PI,
+        )
+
+    def __repr__(self):
+        return "Normal(mu={!r}, sigma={!r})".format(self.mu, self.sigma)
+
+    def __eq__(self, other):
+        if not isinstance(other, Normal):
+            return NotImplemented
+        return (self.mu, self.sigma) == (other.mu, other.sigma)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash((Normal, self.mu, self.sigma))
+
+    def __reduce__(self):
+        return (Normal, (self.mu, self.sigma))
+
+    def cdf(self, x):
+        """
+        Calculate the cumulative distribution function at ``x``.
+        """
+        return 0.5 * pyerf.erfc((self.mu - x) * self._inv_scale)
+
+    def sf(self, x):
+        """
+        Calculate the survival function, ``1 - cdf(x)``, at ``x``.
+
+        Unlike ``1 - cdf(x)`` this stays accurate in the upper tail.
+        """
+        return 0.5 * pyerf.erfc((x - self.mu) * self._inv_scale)
+
+    def ppf(self, p):
+        """
+        Calculate the percent point function (the inverse of :meth:`cdf`)
+        at ``p``.
+
+        Raises
+        ------
+        ValueError
+            If ``p`` is outside [0, 1].
+        """
+        return self.mu + self.sigma * pyerf.ndtri(p)
+
+    def isf(self, q):
+        """
+        Calculate the inverse of :meth:`sf` at ``q``.
+
+        This is ``ppf(1 - q)`` but without forming ``1 - q``, so small ``q``
+        keeps its precision.
+
+        Raises
+        ------
+        ValueError
+            If ``q`` is outside [0, 1].
+        """
+        return self.mu - self.sigma * pyerf.ndtri(q)
+
+    def logpdf(self, x):
+        """
+        Calculate the natural log of the probability density at ``x``.
+        """
+        z = (x - self.mu) * self._inv_scale
+        return self._log_norm - z * z
+
+    def cdf_batch(self, values):
+        """
+        Calculate :meth:`cdf` for each item in ``values``.
+        """
+        erfc, mu, inv_scale = pyerf.erfc, self.mu, self._inv_scale
+        return [0.5 * erfc((mu - x) * inv_scale) for x in values]
+
+    def sf_batch(self, values):
+        """
+        Calculate :meth:`sf` for each item in ``values``.
+        """
+        erfc, mu, inv_scale = pyerf.erfc, self.mu, self._inv_scale
+        return [0.5 * erfc((x - mu) * inv_scale) for x in values]
+
+    def ppf_batch(self, values):
+        """
+        Calculate :meth:`ppf` for each item in ``values``.
+        """
+        ndtri, mu, sigma = pyerf.ndtri, self.mu, self.sigma
+        return [mu + sigma * ndtri(p) for p in values]
+
+    def isf_batch(self, values):
+        """
+        Calculate :meth:`isf` for each item in ``values``.
+        """
+        ndtri, mu, sigma = pyerf.ndtri, self.mu, self.sigma
+        return [mu - sigma * ndtri(q) for q in values]
+
+    def logpdf_batch(self, values):
+        """
+        Calculate :meth:`logpdf` for each item in ``values``.
+        """
+        mu, inv_scale, log_norm = self.mu, self._inv_scale, self._log_norm
+        return [log_norm - ((x - mu) * inv_scale) ** 2 for x in values]
+
+
+class Normals(_Frozen):
+    """
+    A frozen batch of normal distributions, optionally weighted to form a
+    mixture.
+
+    Each method evaluates every component at a single point and returns a
+    list with one item per component. The ``mixture_`` methods combine
+    those using the weights.
+
+    Parameters
+    ----------
+    mus : iterable of numeric
+    sigmas : iterable of numeric
+        The same length as ``mus``. Each must be positive.
+    weights : iterable of numeric, optional
+        Mixture weights, the same length as ``mus``. They are normalized
+        to sum to 1. Defaults to equal weights.
+
+    Raises
+    ------
+    ValueError
+        If the lengths differ, a ``sigma`` isn't positive or a weight is
+        negative or they are all zero.
+
+    Examples
+    --------
+    >>> mixture = Normals([-1, 1], [1, 1])
+    >>> [round(p, 6) for p in mixture.cdf(0)]
+    [0.841345, 0.158655]
+    >>> round(mixture.mixture_cdf(0), 6)
+    0.5
+    >>> round(mixture.mixture_logpdf(0), 6)
+    -1.418939
+    """
+
+    __slots__ = (
+        "mus",
+        "sigmas",
+        "weights",
+        "_inv_scales",
+        "_log_norms",
+        "_log_weights",
+    )
+
+    def __init__(self, mus, sigmas, weights=None):
+        mus = tuple(float(mu) for mu in mus)
+        sigmas = tuple(float(sigma) for sigma in sigmas)
+        if len(sigmas) != len(mus):
+            raise ValueError("`mus` and `sigmas` must be the same length")
+        for sigma in sigmas:
+            _check_sigma(sigma)
+
+        if weights is None:
+            weights = (1.0,) * len(mus)
+        weights = tuple(float(w) for w in weights)
+        if len(weights) != len(mus):
+            raise ValueError("`weights` must be the same length as `mus`")
+        total = sum(weights)
+        if min(weights or [0]) < 0 or not total > 0:
+            raise ValueError("`weights` must be non-negative and not all zero")
+        weights = tuple(w / total for w in weights)
+
+        self._set(
+            mus=mus,
+            sigmas=sigmas,
+            weights=weights,
+            _inv_scales=tuple(INV_SQRT_2 / sigma for sigma in sigmas),
+            _log_norms=tuple(-math.log(sigma) - LOG_SQRT_2PI for sigma in sigmas),
+            _log_weights=tuple(math.log(w) if w else -pyerf.inf for w in weights),
+        )
+
+    def __repr__(self):
+        return "Normals(mus={!r}, sigmas={!r}, weights={!r})".format(
+            list(self.mus), list(self.sigmas), list(self.weights)
+        )
+
+    def __reduce__(self):
+        return (Normals, (self.mus, self.sigmas, self.weights))
+
+    def __len__(self):
+        return len(self.mus)
+
+    def __getitem__(self, index):
+        return Normal(self.mus[index], self.sigmas[index])
+
+    def cdf(self, x):
+        """
+        Calculate the CDF of each component at ``x``.
+        """
+        erfc = pyerf.erfc
+        return [0.5 * erfc((mu - x) * s) for mu, s in zip(self.mus, self._inv_scales)]
+
+    def sf(self, x):
+        """
+        Calculate the survival function of each component at ``x``.
+        """
+        erfc = pyerf.erfc
+        return [0.5 * erfc((x - mu) * s) for mu, s in zip(self.mus, self._inv_scales)]
+
+    def ppf(self, p):
+        """
+        Calculate the percent point function of each component at ``p``.
+        """
+        z = pyerf.ndtri(p)
+        return [mu + sigma * z for mu, sigma in zip(self.mus, self.sigmas)]
+
+    def isf(self, q):
+        """
+        Calculate the inverse survival function of each component at ``q``.
+        """
+        z = pyerf.ndtri(q)
+        return [mu - sigma * z for mu, sigma in zip(self.mus, self.sigmas)]
+
+    def logpdf(self, x):
+        """
+        Calculate the log density of each component at ``x``.
+        """
+        return [
+            log_norm - ((x - mu) * s) ** 2
+            for mu, s, log_norm in zip(self.mus, self._inv_scales, self._log_norms)
+        ]
+
+    def mixture_cdf(self, x):
+        """
+        Calculate the CDF of the mixture at ``x``.
+        """
+        return math.fsum(w * p for w, p in zip(self.weights, self.cdf(x)))
+
+    def mixture_sf(self, x):
+        """
+        Calculate the survival function of the mixture at ``x``.
+        """
+        return math.fsum(w * p for w, p in zip(self.weights, self.sf(x)))
+
+    def mixture_logpdf(self, x):
+        """
+        Calculate the log density of the mixture at ``x``.
+
+        The component densities are combined in log space, so this stays
+        finite far into the tails where every density underflows.
+        """
+        terms = [lw + lp for lw, lp in zip(self._log_weights, self.logpdf(x))]
+        largest = max(terms)
+        if largest == -pyerf.inf:
+            return largest
+        return largest + math.log(math.fsum(math.exp(t - largest) for t in terms))
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Lookup tables for quantized inputs.
+
+An ``n``-bit quantile code ``k`` stands for the midpoint of the ``k``-th of
+``2**n`` equal slices of (-1, 1), so it maps to a normal score through
+``erfinv((2k + 1) / 2**n - 1)``. With at most 65,536 distinct codes it's
+cheaper to compute every value once and convert batches by indexing.
+
+Tables are exactly rounded: each entry starts from ``_ndtri`` and is then
+polished with ``pyerf._reference``. Because that is slow (a few seconds
+for 16 bits), tables are written to disk on first use and memory-mapped
+from then on.
+
+>>> [round(x, 10) for x in dequantize(b"\\x00\\x80\\xff", 8)]  # doctest: +SKIP
+[-2.0404520146, 0.0034618378, 2.0404520146]
+"""
+
+import array
+import os
+
+from . import _reference
+from . import pyerf
+from .__about__ import __version__
+from .cache import default_directory
+from .cache import map_file
+from .cache import write_file
+
+__all__ = [
+    "dequantize",
+    "quantile_table",
+]
+
+MAX_BITS = 16
+
+# array.array typecodes that can't hold negative codes.
+_UNSIGNED = "BHILQ"
+
+# Loaded tables, keyed by (bits, directory), so each file is only mapped
+# once per process.
+_TABLES = {}
+
+
+def _build(bits):
+    """
+    Compute the ``2**bits`` table entries.
+
+    Only the upper half is computed; the lower half is its mirror image.
+    For the upper half ``1 - z`` is exact, so ``erfcinv`` avoids any
+    cancellation.
+    """
+    size = 1 << bits
+    upper = []
+    for k in range(size // 2, size):
+        # q = 1 - z = (2**(bits+1) - 2k - 1) / 2**bits, exact in a double.
+        q = (2 * size - 2 * k - 1) / float(size)
+        x = pyerf.erfcinv(q)
+        upper.append(float(_reference.erfcinv(q, start=x)))
+    lower = [-x for x in reversed(upper)]
+    return array.array("d", lower + upper)
+
+
+def _path(bits, directory):
+    name = "erfinv-u{}-{}.f64".format(bits, __version__)
+    return os.path.join(directory, "tables", name)
+
+
+def _load(path):
+    """
+    Return a float64 view of the table file at ``path``, or None if it's
+    missing or corrupt.
+    """
+    try:
+        f = open(path, "rb")
+    except (IOError, OSError):
+        return None
+    with f:
+        mapping = map_file(f)
+    if mapping is None:
+        return None
+    # The view keeps the mapping alive.
+    return mapping[1]
+
+
+def quantile_table(bits, directory=None):
+    """
+    Return the lookup table for ``bits``-bit quantile codes.
+
+    Entry ``k`` is ``erfinv((2k + 1) / 2**bits - 1)``, exactly rounded.
+
+    Parameters
+    ----------
+    bits : int
+        Between 1 and 16.
+    directory : str, optional
+        Where table files are kept. Defaults to
+        :func:`pyerf.cache.default_directory`. If the file can't be written
+        there, the table is built in memory instead.
+
+    Returns
+    -------
+    sequence of float
+        A read-only, memory-mapped ``memoryview`` (or an ``array.array``
+        if the table couldn't be saved) with ``2**bits`` entries.
+
+    Raises
+    ------
+    ValueError
+        If ``bits`` is out of range.
+    """
+    if not 1 <= bits <= MAX_BITS:
+        raise ValueError("`bits` must be between 1 and {}".format(MAX_BITS))
+    if directory is None:
+        directory = default_directory()
+
+    key = (bits, directory)
+    table = _TABLES.get(key)
+    if table is not None:
+        return table
+
+    path = _path(bits, directory)
+    table = _load(path)
+    if table is None or len(table) != 1 << bits:
+        table = _build(bits)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            write_file(path, table)
+        except (IOError, OSError):
+            pass
+        else:
+            table = _load(path) or table
+
+    _TABLES[key] = table
+    return table
+
+
+def dequantize(codes, bits, directory=None):
+    """
+    Convert ``bits``-bit quantile codes to ``erfinv`` values by table lookup.
+
+    Parameters
+    ----------
+    codes : iterable of int
+        For example ``bytes`` or an ``array.array("H")``.
+    bits : int
+    directory : str, optional
+        See :func:`quantile_table`.
+
+    Returns
+    -------
+    list of float
+
+    Raises
+    ------
+    IndexError
+        If a code is negative or ``2**bits`` or larger.
+    """
+    table = quantile_table(bits, directory)
+    unsigned = isinstance(codes, (bytes, bytearray)) or (
+        isinstance(codes, array.array) and codes.typecode in _UNSIGNED
+    )
+    if not unsigned:
+        # Negative indexes would silently count from the end of the table.
+        codes = list(codes)
+        if codes and min(codes) < 0:
+            raise IndexError("Quantile codes must not be negative")
+    return [table[code] for code in codes]
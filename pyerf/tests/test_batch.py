@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for ``pyerf.batch``.
+"""
+
+import math
+
+try:
+    from math import inf
+except ImportError:
+    inf = float("inf")
+
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from .. import _reference
+from .. import batch
+from .. import pyerf
+
+nan = float("nan")
+
+
+class TestBatch(object):
+    @pytest.mark.parametrize("name", ["erf", "erfc"])
+    @given(st.lists(st.floats(allow_nan=False)))
+    def test_erf_erfc_match_scalar(self, name, values):
+        scalar = getattr(pyerf, name)
+        assert getattr(batch, name)(values) == [scalar(x) for x in values]
+
+    @given(st.lists(st.floats(min_value=-0.999999, max_value=0.999999)))
+    def test_erfinv_matches_scalar(self, values):
+        result = batch.erfinv(values, method="scalar")
+        assert result == [pyerf.erfinv(x) for x in values]
+
+    @given(st.lists(st.floats(min_value=0, max_value=2)))
+    def test_erfcinv_matches_scalar(self, values):
+        result = batch.erfcinv(values, method="scalar")
+        assert result == [pyerf.erfcinv(x) for x in values]
+
+    def test_accepts_generators(self):
+        result = batch.erfcinv(10.0**-k for k in range(1, 301))
+        assert len(result) == 300
+        assert inf not in result
+
+    def test_raises_error(self):
+        with pytest.raises(ValueError):
+            batch.erfinv([0.5, 2])
+        with pytest.raises(ValueError):
+            batch.erfcinv([0.5, -1])
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            batch.erf([0.5], method="nope")
+        with pytest.raises(ValueError):
+            batch.erfc([0.5], method="estrin")
+
+
+class TestEstrin(object):
+    # The Estrin kernels use the same cephes coefficients as the scalar
+    # functions, so they should agree to within a few ULP.
+    @given(st.lists(st.floats(allow_nan=False)))
+    def test_erf_matches_cephes(self, values):
+        result = batch.erf(values, method="estrin")
+        for x, y in zip(values, result):
+            assert y == pytest.approx(pyerf._erf(x), rel=4e-16, abs=1e-300)
+
+    # The scalar erfinv rounds (x + 1) / 2 before taking 1 - y, so it is
+    # inaccurate in the upper tail. Compare against the reference there.
+    @given(st.lists(st.floats(min_value=-1, max_value=1)))
+    def test_erfinv_matches_cephes(self, values):
+        result = batch.erfinv(values, method="estrin")
+        for x, y in zip(values, result):
+            if x > 0.7 and x != 1:
+                expected = float(_reference.erfinv(x))
+            else:
+                expected = pyerf.erfinv(x)
+            assert y == pytest.approx(expected, rel=4e-15, abs=1e-300)
+
+    def test_erfinv_tails(self):
+        values = [1 - 10.0**-k for k in range(1, 16)] + [1 - 2.0**-53]
+        values += [-x for x in values]
+        result = batch.erfinv(values, method="estrin")
+        expected = [float(_reference.erfinv(x)) for x in values]
+        assert result == pytest.approx(expected, rel=4e-15)
+
+    def test_extremes(self):
+        assert batch.erf([0, inf, -inf], method="estrin") == [0, 1, -1]
+        assert batch.erfinv([0, 1, -1], method="estrin") == [0, inf, -inf]
+
+    def test_nan(self):
+        assert math.isnan(batch.erf([nan], method="estrin")[0])
+        assert math.isnan(batch.erfinv([nan], method="estrin")[0])
+
+    def test_erfinv_raises_error(self):
+        with pytest.raises(ValueError):
+            batch.erfinv([0.5, 1.00000001], method="estrin")
+
+
+class TestPartitioned(object):
+    @pytest.mark.parametrize("name", ["erfinv", "erfcinv"])
+    def test_is_default(self, name):
+        values = [0.1, 0.5, 0.9]
+        func = getattr(batch, name)
+        assert func(values) == func(values, method="partitioned")
+
+    # The scalar erfinv loses relative precision for tiny x and in the
+    # upper tail, so compare against it in between only.
+    @given(st.lists(st.floats(min_value=-1, max_value=0.7)))
+    def test_erfinv_matches_cephes(self, values):
+        values = [x for x in values if abs(x) > 1e-8]
+        result = batch.erfinv(values, method="partitioned")
+        expected = [pyerf.erfinv(x) for x in values]
+        assert result == pytest.approx(expected, rel=4e-15)
+
+    @given(st.lists(st.floats(min_value=0, max_value=2)))
+    def test_erfcinv_matches_cephes(self, values):
+        result = batch.erfcinv(values, method="partitioned")
+        expected = [pyerf.erfcinv(x) for x in values]
+        assert result == pytest.approx(expected, rel=4e-15)
+
+    @pytest.mark.parametrize("name", ["erfinv", "erfcinv"])
+    def test_accuracy(self, name):
+        from .. import pareto
+
+        values = [x for _, x in pareto.sweep(name, samples=100)]
+        result = batch._KERNELS[name]["partitioned"](values)
+        reference = getattr(_reference, name)
+        for x, y in zip(values, result):
+            assert pareto.ulp_error(y, reference(x)) < 8, x
+
+    def test_erfinv_tiny(self):
+        # (x + 1) / 2 - 0.5 would lose every digit of these.
+        for x in (1e-20, -3e-200, 5e-324):
+            (y,) = batch.erfinv([x], method="partitioned")
+            assert y == pytest.approx(x * math.sqrt(math.pi) / 2, rel=1e-15)
+
+    def test_erfinv_near_one(self):
+        # (z + 1) / 2 rounds to 1 here, so the scalar version gives up.
+        z = 1 - 2.0**-53
+        (y,) = batch.erfinv([z, -z], method="partitioned")[:1]
+        assert y == pytest.approx(float(_reference.erfinv(z)), rel=1e-15)
+        assert batch.erfinv([-z], method="partitioned") == [-y]
+
+    def test_order_is_preserved(self):
+        values = [0.5, -1, 1e-300, 0.9999999, 1, 0, -0.3, -0.9999999]
+        expected = [
+            float(_reference.erfinv(x)) if abs(x) < 1 else pyerf.erfinv(x)
+            for x in values
+        ]
+        assert batch.erfinv(values) == pytest.approx(expected, rel=4e-15, abs=0)
+
+    def test_extremes(self):
+        assert batch.erfinv([0, 1, -1]) == [0, inf, -inf]
+        assert batch.erfcinv([1, 0, 2, 5e-324]) == [0, inf, -inf, inf]
+
+    def test_nan(self):
+        assert math.isnan(batch.erfinv([nan])[0])
+        assert math.isnan(batch.erfcinv([nan])[0])
+
+    def test_raises_error(self):
+        with pytest.raises(ValueError):
+            batch.erfinv([0.5, -1.00000001])
+        with pytest.raises(ValueError):
+            batch.erfcinv([0.5, 2.00000001])
+
+
+class TestErfDiff(object):
+    @given(st.lists(st.floats(allow_nan=False)), st.lists(st.floats(allow_nan=False)))
+    def test_erf_diff_matches_scalar(self, a_values, b_values):
+        expected = [pyerf.erf_diff(a, b) for a, b in zip(a_values, b_values)]
+        assert batch.erf_diff(a_values, b_values) == expected
+
+    @given(st.lists(st.floats(allow_nan=False)))
+    def test_erf_diff_grid_matches_scalar(self, edges):
+        result = batch.erf_diff_grid(edges)
+        assert len(result) == max(len(edges) - 1, 0)
+        for a, b, diff in zip(edges, edges[1:], result):
+            assert diff == pytest.approx(pyerf.erf_diff(a, b), rel=1e-15, abs=1e-16)
+
+    def test_erf_diff_grid_evaluates_each_edge_once(self, monkeypatch):
+        calls = []
+
+        def counting(func):
+            def wrapper(x):
+                calls.append(x)
+                return func(x)
+
+            return wrapper
+
+        monkeypatch.setattr(pyerf, "erf", counting(pyerf.erf))
+        monkeypatch.setattr(pyerf, "erfc", counting(pyerf.erfc))
+
+        edges = [i / 10.0 for i in range(-80, 81)]
+        batch.erf_diff_grid(edges)
+        assert len(calls) == len(edges)
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for ``pyerf.cache``.
+"""
+
+import array
+import functools
+import os
+
+import pytest
+
+from .. import batch
+from .. import cache
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    return cache.DiskCache(str(tmp_path))
+
+
+def counting(func):
+    """
+    Wrap a batch function so that we can count how often it runs.
+    """
+
+    def erfinv(values, **kwargs):
+        erfinv.calls += 1
+        return func(values, **kwargs)
+
+    erfinv.calls = 0
+    return erfinv
+
+
+class TestDiskCache(object):
+    def test_hit_skips_computation(self, disk_cache):
+        func = counting(batch.erfinv)
+        values = [i / 1000.0 for i in range(-999, 1000)]
+
+        first = disk_cache.apply(func, values, name="erfinv")
+        second = disk_cache.apply(func, array.array("d", values), name="erfinv")
+        assert func.calls == 1
+        assert first == second == batch.erfinv(values)
+
+    def test_key_includes_function_and_kwargs(self, disk_cache):
+        values = [0.1, 0.2]
+        keys = set()
+        for func in (batch.erf, batch.erfinv):
+            for method in ("scalar", "estrin"):
+                doubles = array.array("d", values)
+                keys.add(disk_cache.key(func, doubles, {"method": method}))
+        assert len(keys) == 4
+
+        func = counting(batch.erfinv)
+        disk_cache.apply(func, values, name="erfinv", method="scalar")
+        disk_cache.apply(func, values, name="erfinv", method="estrin")
+        assert func.calls == 2
+
+    def test_callables_need_a_name(self, disk_cache):
+        values = [0.1, 0.2]
+        for func in (lambda v: batch.erf(v), functools.partial(batch.erfinv)):
+            with pytest.raises(TypeError):
+                disk_cache.apply(func, values)
+        assert disk_cache.size() == 0
+
+        # Same __name__, different functions: the names keep them apart.
+        erf = disk_cache.apply(lambda v: batch.erf(v), values, name="erf")
+        erfinv = disk_cache.apply(lambda v: batch.erfinv(v), values, name="erfinv")
+        assert erf == batch.erf(values)
+        assert erfinv == batch.erfinv(values)
+
+    def test_default_method_is_part_of_the_key(self, disk_cache):
+        values = array.array("d", [0.1, 0.2])
+        default = disk_cache.key(batch.erfinv, values, {})
+        assert default == disk_cache.key(
+            batch.erfinv, values, {"method": "partitioned"}
+        )
+        assert default != disk_cache.key(batch.erfinv, values, {"method": "scalar"})
+
+    def test_corrupt_file_is_recomputed(self, disk_cache):
+        func = counting(batch.erfinv)
+        values = [0.1, 0.2, 0.3]
+        expected = disk_cache.apply(func, values, name="erfinv")
+
+        (name,) = os.listdir(disk_cache.directory)
+        path = os.path.join(disk_cache.directory, name)
+        with open(path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"\xff")
+
+        assert disk_cache.apply(func, values, name="erfinv") == expected
+        assert func.calls == 2
+        assert disk_cache.apply(func, values, name="erfinv") == expected
+        assert func.calls == 2
+
+    def test_truncated_file_is_recomputed(self, disk_cache):
+        func = counting(batch.erfinv)
+        values = [0.1, 0.2, 0.3]
+        expected = disk_cache.apply(func, values, name="erfinv")
+
+        (name,) = os.listdir(disk_cache.directory)
+        with open(os.path.join(disk_cache.directory, name), "r+b") as f:
+            f.truncate(20)
+
+        assert disk_cache.apply(func, values, name="erfinv") == expected
+        assert func.calls == 2
+
+    def test_lru_eviction(self, tmp_path):
+        # Room for two entries of 100 values.
+        disk_cache = cache.DiskCache(str(tmp_path), max_bytes=2 * (48 + 800))
+        batches = [[i / 1000.0 + j / 10.0 for i in range(100)] for j in range(3)]
+
+        disk_cache.apply(batch.erfinv, batches[0])
+        disk_cache.apply(batch.erfinv, batches[1])
+        os.utime(disk_cache._path(self._key(disk_cache, batches[0])), (1, 1))
+        os.utime(disk_cache._path(self._key(disk_cache, batches[1])), (2, 2))
+        disk_cache.apply(batch.erfinv, batches[2])
+
+        assert disk_cache.size() <= disk_cache.max_bytes
+        assert len(os.listdir(str(tmp_path))) == 2
+        assert not os.path.exists(disk_cache._path(self._key(disk_cache, batches[0])))
+
+    def test_oversized_results_are_not_stored(self, tmp_path):
+        disk_cache = cache.DiskCache(str(tmp_path), max_bytes=100)
+        disk_cache.apply(batch.erfinv, [0.5] * 100)
+        assert os.listdir(str(tmp_path)) == []
+
+    def test_clear(self, disk_cache):
+        disk_cache.apply(batch.erf, [1, 2, 3])
+        assert disk_cache.size() > 0
+        disk_cache.clear()
+        assert disk_cache.size() == 0
+
+    def test_entry_removed_while_loading(self, disk_cache, monkeypatch):
+        func = counting(batch.erfinv)
+        values = [0.1, 0.2, 0.3]
+        expected = disk_cache.apply(func, values, name="erfinv")
+
+        # Another process evicts the entry between open() and utime().
+        real_utime = os.utime
+
+        def utime(path, times):
+            os.remove(path)
+            return real_utime(path, times)
+
+        monkeypatch.setattr(cache.os, "utime", utime)
+        assert disk_cache.apply(func, values, name="erfinv") == expected
+        assert func.calls == 1
+
+    def test_clear_tolerates_concurrent_removal(self, disk_cache, monkeypatch):
+        disk_cache.apply(batch.erf, [1, 2, 3])
+        entries = disk_cache._entries()
+        for _, _, path in entries:
+            os.remove(path)
+        monkeypatch.setattr(disk_cache, "_entries", lambda: entries)
+        disk_cache.clear()
+
+    def test_errors_are_not_cached(self, disk_cache):
+        with pytest.raises(ValueError):
+            disk_cache.apply(batch.erfinv, [2])
+        assert disk_cache.size() == 0
+
+    def test_default_directory(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("PYERF_CACHE_DIR", str(tmp_path))
+        assert cache.default_directory() == str(tmp_path)
+        monkeypatch.delenv("PYERF_CACHE_DIR")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert cache.default_directory() == os.path.join(str(tmp_path), "pyerf")
+
+    @staticmethod
+    def _key(disk_cache, values):
+        return disk_cache.key(batch.erfinv, array.array("d", values), {})
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for ``pyerf._codegen`` and the generated ``pyerf._kernels``.
+"""
+
+import pytest
+
+from .. import _codegen
+from .. import _kernels
+from .. import pyerf
+
+
+def test_generated_module_is_up_to_date():
+    # If this fails, run ``python -m pyerf._codegen`` and commit the result.
+    with open(_codegen.PATH) as f:
+        assert f.read() == _codegen.generate()
+
+
+@pytest.mark.parametrize("name, coefs_name, monic", _codegen.POLYNOMIALS)
+@pytest.mark.parametrize("x", [0.0, 0.01, 0.1, 0.125, 1.0, 2.5, 7.9, 30.0])
+def test_kernels_match_polevl(name, coefs_name, monic, x):
+    coefs = getattr(pyerf, coefs_name)
+    evl = pyerf._p1evl if monic else pyerf._polevl
+    expected = evl(x, coefs, len(coefs))
+    # The polynomials can cancel outside the range they're used on, so
+    # compare against the sum of the magnitudes of the terms.
+    scale = evl(x, [abs(c) for c in coefs], len(coefs))
+    assert abs(getattr(_kernels, name)(x) - expected) <= 1e-15 * scale
+
+
+def test_kernels_are_straight_line():
+    for name, _, _ in _codegen.POLYNOMIALS:
+        code = getattr(_kernels, name).__code__
+        assert code.co_names == ()
+        assert code.co_varnames in [("x",), ("x", "r")]
+
+
+def test_generated_lines_fit():
+    # Otherwise ``ruff format`` would rewrite the generated module.
+    for line in _codegen.generate().splitlines():
+        assert len(line) <= _codegen.LINE_LENGTH
+
+
+def test_check(tmp_path):
+    path = str(tmp_path / "_kernels.py")
+    _codegen.main(["--output", path])
+    _codegen.main(["--check", "--output", path])
+
+    with open(path, "a") as f:
+        f.write("# edited\n")
+    with pytest.raises(SystemExit):
+        _codegen.main(["--check", "--output", path])
+
+
+def test_check_missing_file(tmp_path):
+    with pytest.raises(SystemExit):
+        _codegen.main(["--check", "--output", str(tmp_path / "missing.py")])
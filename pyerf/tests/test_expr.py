@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for ``pyerf.expr``.
+"""
+
+import math
+
+try:
+    from math import inf
+except ImportError:
+    inf = float("inf")
+
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from .. import expr
+from .. import pyerf
+from ..expr import x
+
+
+class TestSimplify(object):
+    @pytest.mark.parametrize(
+        "expression, expected",
+        [
+            (expr.erf(expr.erfinv(x)), "x"),
+            (expr.erfc(expr.erfcinv(x)), "x"),
+            (expr.erf(expr.erfinv(x) * 2), "erf((erfinv(x) * 2))"),
+            (expr.erfinv(1 - x), "erfcinv(x)"),
+            (expr.erfinv(2 * x - 1) * math.sqrt(2), "ndtri(x)"),
+            (math.sqrt(2) * expr.erfinv(x * 2 - 1), "ndtri(x)"),
+            (expr.erfinv(x * 2 + -1) * math.sqrt(2), "ndtri(x)"),
+            (expr.erfinv(2 * x - 1), "(ndtri(x) / 1.4142135623730951)"),
+            (expr.erfinv(2 * x - 2), "erfinv(((x * 2) - 2))"),
+            (expr.erfc(x) / 2, "(erfc(x) / 2)"),
+            ((x * 2) * 3, "(x * 6)"),
+            (1 * x + 0, "x"),
+        ],
+    )
+    def test_rewrites(self, expression, expected):
+        assert repr(expression.simplify()) == expected
+
+    def test_constant_folding(self):
+        result = expr.erf(expr.erfinv(0.5) * 2).simplify()
+        assert isinstance(result, expr.Const)
+        assert result.value == pyerf.erf(pyerf.erfinv(0.5) * 2)
+
+    def test_does_not_modify_original(self):
+        original = expr.erf(expr.erfinv(x))
+        original.simplify()
+        assert repr(original) == "erf(erfinv(x))"
+
+
+class TestEvaluate(object):
+    @given(st.lists(st.floats(min_value=-0.999, max_value=0.999)))
+    def test_matches_eager(self, values):
+        f = expr.erf(expr.erfinv(x) * 0.5) + expr.erfc(x) / 2 - 1
+        expected = [
+            pyerf.erf(pyerf.erfinv(v) * 0.5) + pyerf.erfc(v) / 2 - 1 for v in values
+        ]
+        assert f.evaluate(values) == pytest.approx(expected)
+
+    def test_ndtri_rewrite_is_more_accurate(self):
+        f = expr.erfinv(2 * x - 1) * math.sqrt(2)
+        result = f.evaluate([1e-20, 1e-300])
+        assert result == [pyerf.ndtri(1e-20), pyerf.ndtri(1e-300)]
+        # The unsimplified form rounds 2 * p - 1 to -1.
+        assert math.sqrt(2) * pyerf.erfinv(2 * 1e-20 - 1) == -inf
+
+    def test_compile_is_reusable(self):
+        f = expr.erfcinv(x / 2).compile()
+        assert f([1, 2]) == [pyerf.erfcinv(0.5), pyerf.erfcinv(1)]
+        assert f((q for q in [0.5])) == [pyerf.erfcinv(0.25)]
+
+    def test_compiled_once(self):
+        f = expr.erf(x * 2)
+        compiled = f.compile()
+        assert f.compile() is compiled
+        assert f([0.25]) == compiled([0.25])
+        assert f._compiled is compiled
+        # Other nodes, including the shared placeholder, keep their own.
+        assert expr.erf(x * 2).compile() is not compiled
+        assert x.compile() is not compiled
+
+    def test_special_constants(self):
+        assert expr.erf(x * inf).evaluate([1, -1]) == [1, -1]
+
+    def test_domain_errors(self):
+        with pytest.raises(ValueError):
+            expr.erfinv(x * 4).evaluate([0.5])
+
+    def test_call(self):
+        assert (x * 2)([1, 2]) == [2, 4]
+
+    def test_type_errors(self):
+        with pytest.raises(TypeError):
+            expr.erf("a")
+        with pytest.raises(TypeError):
+            x + "a"
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for ``pyerf.pareto``.
+"""
+
+import csv
+import io
+import json
+import math
+
+import pytest
+
+from .. import _reference
+from .. import batch
+from .. import pareto
+from .. import pyerf
+
+
+class TestUlpError(object):
+    @pytest.mark.parametrize(
+        "computed, exact, expected",
+        [
+            (1.0, _reference.D(1), 0),
+            (1.0 + 2**-52, _reference.D(1), 1),
+            (1.0, _reference.D(1) + _reference.D(2) ** -54, 0.25),
+            (0.0, _reference.D(5e-324) / 4, 0.25),
+            (float("inf"), _reference.D(1), float("inf")),
+            (float("nan"), _reference.D(1), float("inf")),
+        ],
+    )
+    def test_ulp_error(self, computed, exact, expected):
+        assert pareto.ulp_error(computed, exact) == pytest.approx(expected, rel=1e-9)
+
+
+class TestSweep(object):
+    @pytest.mark.parametrize("name", pareto.FUNCTIONS)
+    def test_regions_and_domain(self, name):
+        inputs = pareto.sweep(name, samples=20)
+        regions = set(region for region, _ in inputs)
+        assert regions == set(r for r, _ in pareto._REGIONS[name]) | {"boundary"}
+        for _, x in inputs:
+            getattr(pyerf, name)(x)
+
+    def test_boundaries_are_straddled(self):
+        inputs = [x for region, x in pareto.sweep("erfc", 0) if region == "boundary"]
+        assert 8.0 in inputs
+        assert max(x for x in inputs if x < 8) == pareto._next_after(8.0, -1)
+        assert min(x for x in inputs if x > 8) == pareto._next_after(8.0, 1)
+
+    def test_odd_functions_are_mirrored(self):
+        inputs = [x for _, x in pareto.sweep("erf", samples=50)]
+        assert any(x < 0 for x in inputs)
+        assert any(x > 0 for x in inputs)
+
+    def test_reproducible(self):
+        assert pareto.sweep("ndtri", 10, seed=3) == pareto.sweep("ndtri", 10, seed=3)
+        assert pareto.sweep("ndtri", 10, seed=3) != pareto.sweep("ndtri", 10, seed=4)
+
+
+class TestBackends(object):
+    @pytest.mark.parametrize("name", ["erf", "erfc", "erfinv", "erfcinv"])
+    def test_every_batch_method(self, name):
+        assert set(batch._KERNELS[name]) <= set(pareto.backends(name))
+
+    def test_cephes(self):
+        if pyerf.erf is pyerf._erf:
+            pytest.skip("math.erf is not available")
+        assert pareto.backends("erf")["cephes"]([0.5]) == [pyerf._erf(0.5)]
+
+    def test_ndtri(self):
+        assert pareto.backends("ndtri")["scalar"]([0.975]) == [pyerf.ndtri(0.975)]
+
+
+@pytest.fixture(scope="module")
+def rows():
+    return pareto.report(samples=30, repeat=1)
+
+
+class TestReport(object):
+    def test_rows(self, rows):
+        names = [(row["function"], row["backend"]) for row in rows]
+        for name in pareto.FUNCTIONS:
+            for backend in pareto.backends(name):
+                assert (name, backend) in names
+        for row in rows:
+            assert set(row) == set(pareto.COLUMNS)
+            assert row["failures"] == 0
+            assert row["values_per_second"] > 0
+            assert 0 <= row["mean_ulp"] <= row["max_ulp"]
+
+    def test_accuracy(self, rows):
+        row = [
+            r for r in rows if (r["function"], r["backend"]) == ("erfcinv", "scalar")
+        ]
+        assert row[0]["max_ulp"] < 10
+
+    def test_every_function_has_a_pareto_backend(self, rows):
+        for name in pareto.FUNCTIONS:
+            assert any(row["pareto"] for row in rows if row["function"] == name)
+
+    def test_mark_pareto(self):
+        rows = [
+            {"max_ulp": 1.0, "values_per_second": 10.0},
+            {"max_ulp": 2.0, "values_per_second": 20.0},
+            {"max_ulp": 2.0, "values_per_second": 5.0},
+            {"max_ulp": 1.0, "values_per_second": 10.0},
+        ]
+        pareto._mark_pareto(rows)
+        assert [row["pareto"] for row in rows] == [True, True, False, True]
+
+    def test_failures_are_counted(self, monkeypatch):
+        def picky(values):
+            if any(x > 0.5 for x in values):
+                raise ValueError("too big")
+            return [pyerf.erfcinv(x) for x in values]
+
+        monkeypatch.setattr(pareto, "backends", lambda name: {"picky": picky})
+        (row,) = pareto.report(["erfcinv"], samples=10, repeat=1)
+        assert 0 < row["failures"] < row["inputs"]
+        assert row["max_ulp"] < 10
+
+
+class TestOutput(object):
+    rows = [
+        {
+            "function": "erf",
+            "backend": "scalar",
+            "inputs": 3,
+            "failures": 0,
+            "max_ulp": 0.5,
+            "mean_ulp": 0.25,
+            "worst_input": 0.1,
+            "worst_region": "abs(x) <= 1",
+            "values_per_second": 1e6,
+            "pareto": True,
+        }
+    ]
+
+    def test_json(self):
+        f = io.StringIO()
+        pareto.write_json(self.rows, f)
+        assert json.loads(f.getvalue()) == self.rows
+
+    def test_csv(self):
+        f = io.StringIO()
+        pareto.write_csv(self.rows, f)
+        (row,) = list(csv.DictReader(io.StringIO(f.getvalue())))
+        assert row["backend"] == "scalar"
+        assert float(row["max_ulp"]) == 0.5
+
+    def test_main(self, tmp_path):
+        path = str(tmp_path / "report.csv")
+        pareto.main(
+            [
+                "erfcinv",
+                "--samples",
+                "5",
+                "--repeat",
+                "1",
+                "--format",
+                "csv",
+                "--output",
+                path,
+            ]
+        )
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+        assert set(row["function"] for row in rows) == {"erfcinv"}
+
+    def test_main_unknown_function(self):
+        with pytest.raises(SystemExit):
+            pareto.main(["gamma"])
+
+
+@pytest.mark.parametrize(
+    "p", [1e-300, 1e-20, 0.025, 0.3, 0.5 - 2**-53, 0.5, 0.5 + 2**-53, 0.7, 0.975]
+)
+def test_reference_ndtri(p):
+    assert float(_reference.ndtri(p)) == pytest.approx(
+        pyerf.ndtri(p), rel=1e-14, abs=1e-300
+    )
+    if p != 0.5:
+        assert math.copysign(1, float(_reference.ndtri(p))) == math.copysign(1, p - 0.5)
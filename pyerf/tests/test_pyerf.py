@@ -6,6 +6,7 @@ Created by Douglas Thor on 2017-02-22 16:08:02 UTC.
 """
 
 import decimal
+import math
 import os
 
 try:
@@ -127,6 +128,76 @@ class TestErfInv(object):
             raise AssertionError(err_txt)
 
 
+class TestErfcInv(object):
+    def test_erfcinv_matches_erfinv(self):
+        for q in frange(0, 2, "0.001"):
+            assert pyerf.erfcinv(q) == pytest.approx(pyerf.erfinv(1 - q))
+
+    def test_erfcinv_tiny_arguments(self, use_math_stdlib):
+        # erfinv(1 - q) would return inf for all of these.
+        for k in range(1, 308):
+            q = 10.0**-k
+            x = pyerf.erfcinv(q)
+            assert x != inf
+            assert pyerf.erfc(x) == pytest.approx(q, rel=1e-12)
+
+    def test_erfcinv_extremes(self):
+        assert pyerf.erfcinv(0) == inf
+        assert pyerf.erfcinv(2) == -inf
+        assert pyerf.erfcinv(1) == 0
+
+    def test_erfcinv_raises_error(self):
+        values = (
+            -1,
+            3,
+            -0.00000001,
+            2.00000001,
+            inf,
+        )
+        for val in values:
+            with pytest.raises(ValueError):
+                pyerf.erfcinv(val)
+
+    @given(st.floats())
+    def test_exceptions(self, x):
+        allowed_exceptions = (ValueError,)
+        try:
+            pyerf.erfcinv(x)
+        except allowed_exceptions:
+            pass
+        except Exception as err:
+            err_txt = "An unexpected exception was raised! {}".format(err)
+            raise AssertionError(err_txt)
+
+
+class TestNdtri(object):
+    def test_ndtri_matches_erfinv(self):
+        for p in frange(0, 1, "0.001"):
+            expected = math.sqrt(2) * pyerf.erfinv(2 * p - 1)
+            assert pyerf.ndtri(p) == pytest.approx(expected)
+
+    def test_ndtri_extremes(self):
+        assert pyerf.ndtri(0) == -inf
+        assert pyerf.ndtri(1) == inf
+        assert pyerf.ndtri(0.5) == 0
+
+    def test_ndtri_raises_error(self):
+        for val in (-1, 2, -0.00000001, 1.00000001, inf):
+            with pytest.raises(ValueError):
+                pyerf.ndtri(val)
+
+    @given(st.floats())
+    def test_exceptions(self, x):
+        allowed_exceptions = (ValueError,)
+        try:
+            pyerf.ndtri(x)
+        except allowed_exceptions:
+            pass
+        except Exception as err:
+            err_txt = "An unexpected exception was raised! {}".format(err)
+            raise AssertionError(err_txt)
+
+
 class TestErf(object):
     def test_erf_error(self):
         # values from
@@ -275,6 +346,35 @@ class TestErfErfc(object):
             assert round(pyerf.erf(x) + pyerf.erfc(x), 10) == 1
 
 
+class TestErfDiff(object):
+    def test_erf_diff_tails(self, use_math_stdlib):
+        # erfc(6) - erfc(7), from
+        # http://keisan.casio.com/exec/system/1180573449
+        expected = 2.151973671249891311659e-17 - 4.183825607779414398614e-23
+        assert pyerf.erf(7) - pyerf.erf(6) == 0
+        assert pyerf.erf_diff(6, 7) == pytest.approx(expected, rel=1e-10)
+        assert pyerf.erf_diff(-7, -6) == pytest.approx(expected, rel=1e-10)
+        assert pyerf.erf_diff(7, 6) == pytest.approx(-expected, rel=1e-10)
+
+    def test_erf_diff_near_zero(self, use_math_stdlib):
+        # Subtracting erfc values here would cancel instead.
+        expected = pyerf.erf(2e-10) - pyerf.erf(1e-10)
+        assert pyerf.erf_diff(1e-10, 2e-10) == expected
+
+    @given(
+        st.floats(min_value=-6, max_value=6),
+        st.floats(min_value=-6, max_value=6),
+    )
+    def test_erf_diff_matches_erf(self, use_math_stdlib, a, b):
+        expected = pyerf.erf(b) - pyerf.erf(a)
+        assert pyerf.erf_diff(a, b) == pytest.approx(expected, abs=1e-15)
+
+    def test_erf_diff_extremes(self, use_math_stdlib):
+        assert pyerf.erf_diff(-inf, inf) == 2
+        assert pyerf.erf_diff(inf, inf) == 0
+        assert pyerf.erf_diff(0, 0) == 0
+
+
 class TestErfErfInv(object):
     @given(st.floats(min_value=-1, max_value=1, allow_nan=False))
     def test_erf_erfinv_compliments(self, use_math_stdlib, x):
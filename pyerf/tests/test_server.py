@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for ``pyerf.server``.
+"""
+
+import os
+import socket
+import threading
+
+import pytest
+
+from .. import batch
+from .. import server
+
+has_unix_sockets = hasattr(socket, "AF_UNIX")
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def address(request, tmp_path):
+    if request.param == "tcp":
+        return ("127.0.0.1", 0)
+    if not has_unix_sockets:
+        pytest.skip("Unix sockets not supported")
+    return str(tmp_path / "pyerf.sock")
+
+
+class TestServer(object):
+    def test_round_trip(self, address):
+        values = [-0.9, -0.1, 0, 0.25, 0.999]
+        with server.Server(address) as srv:
+            with server.Client(srv.address, timeout=10) as client:
+                assert client.erf(values) == batch.erf(values)
+                assert client.erfc(values) == batch.erfc(values)
+                assert client.erfinv(values) == batch.erfinv(values)
+                assert client.erfcinv([1e-300, 1]) == batch.erfcinv([1e-300, 1])
+                assert client.erf([]) == []
+
+                metrics = client.metrics()
+                assert metrics["requests"] == 5
+                assert metrics["values"] == 17
+
+        if not isinstance(address, tuple):
+            assert not os.path.exists(address)
+
+    def test_errors(self, address):
+        with server.Server(address) as srv:
+            with server.Client(srv.address, timeout=10) as client:
+                with pytest.raises(ValueError):
+                    client.erfinv([0.5, 2])
+                # The connection is still usable afterwards.
+                assert client.erfinv([0.5]) == batch.erfinv([0.5])
+                with pytest.raises(ValueError):
+                    client._call(99, [1])
+            assert srv.metrics()["errors"] == 1
+
+    def test_truncated_request_is_dropped(self):
+        with server.Server(("127.0.0.1", 0)) as srv:
+            sock = socket.create_connection(srv.address, 10)
+            with sock:
+                sock.sendall(server.HEADER.pack(3, 4))
+                sock.shutdown(socket.SHUT_WR)
+                # Closed without a reply.
+                assert sock.recv(1024) == b""
+            assert srv.metrics()["requests"] == 0
+
+    def test_requests_after_shutdown_fail(self, address):
+        srv = server.Server(address).start()
+        with server.Client(srv.address, timeout=10) as client:
+            assert client.erf([0.5]) == batch.erf([0.5])
+            srv.shutdown()
+            with pytest.raises(ValueError, match="shutting down"):
+                client.erf([0.5])
+
+    def test_stop_fails_queued_requests(self):
+        coalescer = server._Coalescer(max_batch=10, max_wait=0)
+        coalescer.stop()
+        # Left behind the sentinel, as if queued just before stop().
+        request = server._Request("erf", [0.5])
+        coalescer.queue.put(None)
+        coalescer.queue.put(request)
+        coalescer.stop()
+        assert request.done.is_set()
+        assert isinstance(request.error, RuntimeError)
+
+    def test_coalescing(self):
+        n_clients = 16
+        barrier = threading.Barrier(n_clients)
+        results = [None] * n_clients
+
+        def work(srv, i):
+            with server.Client(srv.address, timeout=10) as client:
+                barrier.wait()
+                results[i] = client.erfinv([i / 100.0])
+
+        # A long max_wait so that every request lands in the first batch.
+        with server.Server(("127.0.0.1", 0), max_wait=0.5) as srv:
+            threads = [
+                threading.Thread(target=work, args=(srv, i)) for i in range(n_clients)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            metrics = srv.metrics()
+
+        assert results == [batch.erfinv([i / 100.0]) for i in range(n_clients)]
+        assert metrics["requests"] == n_clients
+        assert metrics["batches"] < n_clients
+        assert metrics["max_queue_depth"] > 1
+        assert metrics["values_per_second"] > 0
+
+    def test_bad_value_only_fails_its_own_request(self):
+        n_clients = 8
+        barrier = threading.Barrier(n_clients)
+        errors = [None] * n_clients
+
+        def work(srv, i):
+            with server.Client(srv.address, timeout=10) as client:
+                barrier.wait()
+                try:
+                    client.erfinv([2 if i == 3 else 0.5])
+                except ValueError as err:
+                    errors[i] = err
+
+        with server.Server(("127.0.0.1", 0), max_wait=0.5) as srv:
+            threads = [
+                threading.Thread(target=work, args=(srv, i)) for i in range(n_clients)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert [i for i, err in enumerate(errors) if err is not None] == [3]
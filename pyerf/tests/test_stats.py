@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for ``pyerf.stats``.
+"""
+
+import array
+import math
+
+try:
+    from math import inf
+except ImportError:
+    inf = float("inf")
+
+import pytest
+from hypothesis import assume
+from hypothesis import given
+from hypothesis import strategies as st
+
+from .. import pyerf
+from .. import stats
+
+
+class TestTwoSidedPValues(object):
+    def test_known_values(self):
+        known_values = (
+            (0, 1),
+            (1, 0.3173105078629141),
+            (1.959963984540054, 0.05),
+            (-3, 0.002699796063260207),
+            (6, 1.973175290075e-09),
+        )
+        for z, expected in known_values:
+            assert stats.two_sided_pvalue(z) == pytest.approx(expected)
+
+    def test_batch_accepts_buffers(self):
+        z_scores = array.array("d", [0.5, -1.5, 3, 10])
+        expected = [stats.two_sided_pvalue(z) for z in z_scores]
+        assert stats.two_sided_pvalues(z_scores) == expected
+        assert stats.two_sided_pvalues(memoryview(z_scores)) == expected
+
+    @given(st.floats(min_value=-37, max_value=37))
+    def test_log_matches_log_of_pvalue(self, z):
+        expected = math.log(stats.two_sided_pvalue(z))
+        assert stats.two_sided_pvalue(z, log=True) == pytest.approx(expected)
+
+    def test_log_extreme_tails(self):
+        # p underflows to zero but log(p) is still finite and decreasing.
+        z_scores = [40, 100, 1e10, 1e60]
+        assert stats.two_sided_pvalues(z_scores) == [0, 0, 0, 0]
+        log_p = stats.two_sided_pvalues(z_scores, log=True)
+        assert all(-inf < p < 0 for p in log_p)
+        assert log_p == sorted(log_p, reverse=True)
+        # Leading asymptotic term of log(erfc(x)) is -x**2.
+        assert log_p[1] == pytest.approx(-100 * 100 / 2, rel=1e-3)
+        assert stats.two_sided_pvalue(inf, log=True) == -inf
+
+    def test_streaming(self):
+        chunks = [[0, 1], [], array.array("d", [-2, 50])]
+        result = list(stats.iter_two_sided_pvalues(chunks, log=True))
+        assert result == [stats.two_sided_pvalues(c, log=True) for c in chunks]
+
+
+class TestBonferroni(object):
+    def test_bonferroni(self):
+        assert stats.bonferroni([0.01, 0.2, 0.5]) == pytest.approx([0.03, 0.6, 1])
+
+    def test_bonferroni_chunks(self):
+        pvalues = [0.001, 0.01, 0.02, 0.3]
+        chunked = stats.bonferroni(pvalues[:2], n_tests=4)
+        chunked += stats.bonferroni(pvalues[2:], n_tests=4)
+        assert chunked == stats.bonferroni(pvalues)
+
+    def test_bonferroni_log(self):
+        pvalues = [1e-5, 0.01, 0.5]
+        log_p = [math.log(p) for p in pvalues]
+        result = stats.bonferroni(log_p, log=True)
+        expected = [math.log(p) for p in stats.bonferroni(pvalues)]
+        assert result == pytest.approx(expected)
+
+    def test_empty(self):
+        assert stats.bonferroni([]) == []
+        assert stats.bonferroni([], log=True) == []
+
+
+class TestBenjaminiHochberg(object):
+    def test_known_values(self):
+        # Compare R: p.adjust(c(0.01, 0.04, 0.03, 0.005, 0.5), "BH")
+        pvalues = [0.01, 0.04, 0.03, 0.005, 0.5]
+        expected = [0.025, 0.05, 0.05, 0.025, 0.5]
+        assert stats.benjamini_hochberg(pvalues) == pytest.approx(expected)
+
+    def test_ties_and_empty(self):
+        assert stats.benjamini_hochberg([0.02, 0.02]) == [0.02, 0.02]
+        assert stats.benjamini_hochberg([]) == []
+
+    @given(st.lists(st.floats(min_value=1e-300, max_value=1), min_size=1))
+    def test_log_matches_linear(self, pvalues):
+        log_p = [math.log(p) for p in pvalues]
+        result = stats.benjamini_hochberg(log_p, log=True)
+        expected = stats.benjamini_hochberg(pvalues)
+        assert [math.exp(p) for p in result] == pytest.approx(expected)
+
+    @given(st.lists(st.floats(min_value=0, max_value=1)))
+    def test_adjusted_bounds(self, pvalues):
+        result = stats.benjamini_hochberg(array.array("d", pvalues))
+        for p, adjusted in zip(pvalues, result):
+            assert p <= adjusted <= 1
+
+
+class TestRankInverseNormal(object):
+    def reference(self, data, c):
+        # Straightforward version: average ranks, one _ndtri call per value.
+        n = len(data)
+        scores = []
+        for x in data:
+            below = sum(1 for y in data if y < x)
+            ties = sum(1 for y in data if y == x)
+            rank = below + (ties + 1) / 2.0
+            scores.append(pyerf._ndtri((rank - c) / (n - 2 * c + 1)))
+        return scores
+
+    @pytest.mark.parametrize("method", sorted(stats.RANK_OFFSETS))
+    @given(st.lists(st.integers(min_value=-5, max_value=5)))
+    def test_matches_reference(self, method, data):
+        c = stats.RANK_OFFSETS[method]
+        result = stats.rank_inverse_normal(data, method)
+        assert result == pytest.approx(self.reference(data, c), rel=1e-14, abs=1e-15)
+
+    @given(st.lists(st.floats(allow_nan=False), unique=True))
+    def test_scores_are_symmetric(self, data):
+        result = sorted(stats.rank_inverse_normal(data))
+        assert result == [-x for x in reversed(result)]
+
+    def test_halves_ndtri_calls(self, monkeypatch):
+        calls = []
+
+        def counting_ndtri(y):
+            calls.append(y)
+            return _ndtri(y)
+
+        _ndtri = pyerf._ndtri
+        monkeypatch.setattr(pyerf, "_ndtri", counting_ndtri)
+
+        stats.rank_inverse_normal(range(1000))
+        assert len(calls) == 500
+
+        # 4 distinct values, so only 2 evaluations.
+        del calls[:]
+        stats.rank_inverse_normal([3, 1, 2, 4] * 250)
+        assert len(calls) == 2
+
+    def test_package_level(self):
+        from .. import rank_inverse_normal
+
+        assert rank_inverse_normal([1, 2, 3]) == stats.rank_inverse_normal([1, 2, 3])
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            stats.rank_inverse_normal([1, 2, 3], method="nope")
+
+
+class TestNormal(object):
+    dist = stats.Normal(3.0, 2.0)
+
+    @given(st.floats(min_value=-30, max_value=30))
+    def test_cdf_and_sf(self, x):
+        z = (x - 3.0) / 2.0
+        assert self.dist.cdf(x) == pytest.approx(
+            0.5 * (1 + pyerf.erf(z / math.sqrt(2))), abs=1e-15
+        )
+        assert self.dist.sf(x) == pytest.approx(
+            0.5 * pyerf.erfc(z / math.sqrt(2)), rel=1e-14
+        )
+
+    @given(st.floats(min_value=1e-300, max_value=1))
+    def test_ppf_and_isf(self, p):
+        assume(p < 1)
+        assert self.dist.ppf(p) == pytest.approx(3.0 + 2.0 * pyerf.ndtri(p), rel=1e-14)
+        assert self.dist.isf(p) == pytest.approx(3.0 - 2.0 * pyerf.ndtri(p), rel=1e-14)
+
+    @given(st.floats(min_value=-1e3, max_value=1e3))
+    def test_logpdf(self, x):
+        expected = -0.5 * ((x - 3.0) / 2.0) ** 2 - math.log(
+            2.0 * math.sqrt(2 * math.pi)
+        )
+        assert self.dist.logpdf(x) == pytest.approx(expected, rel=1e-14)
+
+    def test_round_trip(self):
+        for p in (1e-20, 0.01, 0.5, 0.9):
+            assert self.dist.cdf(self.dist.ppf(p)) == pytest.approx(p, rel=1e-13)
+            assert self.dist.sf(self.dist.isf(p)) == pytest.approx(p, rel=1e-13)
+
+    def test_tails(self):
+        dist = stats.Normal()
+        assert dist.sf(10) == pytest.approx(7.61985302416e-24)
+        assert dist.cdf(-10) == dist.sf(10)
+        assert dist.isf(1e-300) == -dist.ppf(1e-300)
+        assert dist.ppf(0) == -inf
+        assert dist.ppf(1) == inf
+        assert dist.isf(0) == inf
+
+    def test_ppf_nan(self):
+        # Same as pyerf.ndtri.
+        assert math.isnan(self.dist.ppf(float("nan")))
+        assert math.isnan(self.dist.isf_batch([0.5, float("nan")])[1])
+
+    @pytest.mark.parametrize("p", [-0.1, 1.1])
+    def test_ppf_out_of_range(self, p):
+        with pytest.raises(ValueError):
+            self.dist.ppf(p)
+        with pytest.raises(ValueError):
+            self.dist.isf_batch([0.5, p])
+
+    @pytest.mark.parametrize("method", ["cdf", "sf", "ppf", "isf", "logpdf"])
+    def test_batch_matches_scalar(self, method):
+        values = array.array("d", [0.001, 0.25, 0.5, 0.75, 0.999])
+        scalar = getattr(self.dist, method)
+        assert getattr(self.dist, method + "_batch")(values) == [
+            scalar(x) for x in values
+        ]
+
+    @pytest.mark.parametrize("sigma", [0, -1, float("nan")])
+    def test_invalid_sigma(self, sigma):
+        with pytest.raises(ValueError):
+            stats.Normal(0, sigma)
+
+    def test_frozen(self):
+        with pytest.raises(AttributeError):
+            self.dist.mu = 1
+        with pytest.raises(AttributeError):
+            self.dist.other = 1
+        with pytest.raises(AttributeError):
+            del self.dist.sigma
+        assert not hasattr(self.dist, "__dict__")
+
+    def test_value_semantics(self):
+        import pickle
+
+        assert stats.Normal(3, 2) == self.dist
+        assert stats.Normal(3, 1) != self.dist
+        assert len({stats.Normal(3, 2), self.dist}) == 1
+        assert pickle.loads(pickle.dumps(self.dist)) == self.dist
+        assert repr(self.dist) == "Normal(mu=3.0, sigma=2.0)"
+
+
+class TestNormals(object):
+    mixture = stats.Normals([-1.0, 0.0, 4.0], [1.0, 0.5, 2.0], [1, 2, 1])
+
+    def test_components_match_normal(self):
+        x = 0.3
+        for method in ("cdf", "sf", "logpdf"):
+            expected = [getattr(dist, method)(x) for dist in self.mixture]
+            assert getattr(self.mixture, method)(x) == expected
+        for method in ("ppf", "isf"):
+            expected = [getattr(dist, method)(0.2) for dist in self.mixture]
+            assert getattr(self.mixture, method)(0.2) == pytest.approx(
+                expected, rel=1e-15
+            )
+
+    def test_weights(self):
+        assert self.mixture.weights == (0.25, 0.5, 0.25)
+        assert stats.Normals([1, 2], [1, 1]).weights == (0.5, 0.5)
+
+    @pytest.mark.parametrize("x", [-5.0, 0.0, 0.3, 2.0, 10.0])
+    def test_mixture(self, x):
+        weights = self.mixture.weights
+        cdf = sum(w * d.cdf(x) for w, d in zip(weights, self.mixture))
+        sf = sum(w * d.sf(x) for w, d in zip(weights, self.mixture))
+        pdf = sum(w * math.exp(d.logpdf(x)) for w, d in zip(weights, self.mixture))
+        assert self.mixture.mixture_cdf(x) == pytest.approx(cdf, rel=1e-14)
+        assert self.mixture.mixture_sf(x) == pytest.approx(sf, rel=1e-14)
+        assert self.mixture.mixture_logpdf(x) == pytest.approx(math.log(pdf), rel=1e-14)
+
+    def test_mixture_logpdf_far_tail(self):
+        # Every density underflows, but the log stays finite and is
+        # dominated by the widest component.
+        x = 200.0
+        assert math.exp(self.mixture[2].logpdf(x)) == 0
+        expected = math.log(0.25) + self.mixture[2].logpdf(x)
+        assert self.mixture.mixture_logpdf(x) == pytest.approx(expected, rel=1e-12)
+
+    def test_zero_weight(self):
+        mixture = stats.Normals([0, 5], [1, 1], [1, 0])
+        assert mixture.mixture_logpdf(1.0) == pytest.approx(stats.Normal().logpdf(1.0))
+
+    @pytest.mark.parametrize(
+        "mus, sigmas, weights",
+        [
+            ([0, 1], [1], None),
+            ([0, 1], [1, 0], None),
+            ([0, 1], [1, 1], [1]),
+            ([0, 1], [1, 1], [1, -1]),
+            ([0, 1], [1, 1], [0, 0]),
+        ],
+    )
+    def test_invalid(self, mus, sigmas, weights):
+        with pytest.raises(ValueError):
+            stats.Normals(mus, sigmas, weights)
+
+    def test_container(self):
+        assert len(self.mixture) == 3
+        assert self.mixture[1] == stats.Normal(0.0, 0.5)
+        with pytest.raises(AttributeError):
+            self.mixture.mus = ()
+
+    def test_package_level(self):
+        from .. import Normal
+        from .. import Normals
+
+        assert Normal is stats.Normal
+        assert Normals is stats.Normals
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for ``pyerf.tables``.
+"""
+
+import array
+import os
+
+import pytest
+
+from .. import _reference
+from .. import pyerf
+from .. import tables
+
+
+@pytest.fixture(autouse=True)
+def clear_loaded_tables():
+    tables._TABLES.clear()
+    yield
+    tables._TABLES.clear()
+
+
+class TestQuantileTable(object):
+    @pytest.mark.parametrize("bits", [1, 2, 5, 8])
+    def test_exactly_rounded(self, tmp_path, bits):
+        table = tables.quantile_table(bits, str(tmp_path))
+        size = 1 << bits
+        assert len(table) == size
+        for k in range(size):
+            z = (2 * k + 1) / float(size) - 1
+            assert table[k] == float(_reference.erfinv(z))
+            assert table[k] == pytest.approx(pyerf.erfinv(z), rel=1e-14)
+
+    def test_symmetric(self, tmp_path):
+        table = tables.quantile_table(10, str(tmp_path))
+        assert list(table) == [-x for x in reversed(table)]
+
+    def test_saved_and_memory_mapped(self, tmp_path, monkeypatch):
+        table = tables.quantile_table(8, str(tmp_path))
+        assert isinstance(table, memoryview)
+        assert table.readonly
+        assert os.path.exists(tables._path(8, str(tmp_path)))
+
+        # Reloading from disk doesn't rebuild.
+        tables._TABLES.clear()
+        monkeypatch.setattr(tables, "_build", None)
+        reloaded = tables.quantile_table(8, str(tmp_path))
+        assert list(reloaded) == list(table)
+
+    def test_corrupt_file_is_rebuilt(self, tmp_path):
+        expected = list(tables.quantile_table(6, str(tmp_path)))
+        tables._TABLES.clear()
+
+        path = tables._path(6, str(tmp_path))
+        with open(path, "r+b") as f:
+            f.seek(-3, os.SEEK_END)
+            f.write(b"\x00\x00\x00")
+
+        assert list(tables.quantile_table(6, str(tmp_path))) == expected
+
+    def test_unwritable_directory(self, tmp_path):
+        not_a_directory = tmp_path / "file"
+        not_a_directory.write_text("")
+        table = tables.quantile_table(4, str(not_a_directory))
+        assert isinstance(table, array.array)
+        assert len(table) == 16
+
+    @pytest.mark.parametrize("bits", [0, 17])
+    def test_bits_out_of_range(self, tmp_path, bits):
+        with pytest.raises(ValueError):
+            tables.quantile_table(bits, str(tmp_path))
+
+
+class TestDequantize(object):
+    def test_uint8(self, tmp_path):
+        table = tables.quantile_table(8, str(tmp_path))
+        codes = bytes(bytearray([0, 1, 127, 128, 255]))
+        result = tables.dequantize(codes, 8, str(tmp_path))
+        assert result == [table[0], table[1], table[127], table[128], table[255]]
+        assert result[0] == -result[-1]
+
+    def test_uint16(self, tmp_path):
+        codes = array.array("H", [0, 32767, 32768, 65535])
+        result = tables.dequantize(codes, 16, str(tmp_path))
+        expected = [pyerf.erfinv((2 * k + 1) / 65536.0 - 1) for k in codes]
+        assert result == pytest.approx(expected, rel=1e-14)
+
+    @pytest.mark.parametrize("codes", [[256], [0, -1], array.array("h", [3, -256])])
+    def test_code_out_of_range(self, tmp_path, codes):
+        with pytest.raises(IndexError):
+            tables.dequantize(codes, 8, str(tmp_path))
+
+    def test_generator(self, tmp_path):
+        codes = (k for k in [0, 128, 255])
+        expected = tables.dequantize(b"\x00\x80\xff", 8, str(tmp_path))
+        assert tables.dequantize(codes, 8, str(tmp_path)) == expected